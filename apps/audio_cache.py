@@ -0,0 +1,159 @@
+# apps/audio_cache.py
+import asyncio
+import os
+import re
+from collections import OrderedDict
+
+import discord
+from discord.oggparse import OggStream
+
+from apps.loudness import TARGET_LUFS, TARGET_TRUE_PEAK, niced
+from apps.track import TrackInfo
+
+
+class CachedOpusAudio(discord.AudioSource):
+    """Plays a cached Ogg/Opus file by sending its packets as-is (no FFmpeg, no transcoding)."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._packet_iter = OggStream(self._file).iter_packets()
+
+    def read(self) -> bytes:
+        return next(self._packet_iter, b'')
+
+    def is_opus(self) -> bool:
+        return True
+
+    def cleanup(self):
+        self._file.close()
+
+
+class AudioCache:
+    """
+    On-disk LRU cache of loudness-normalized Ogg/Opus files, keyed by video id.
+
+    A track is encoded in the background once it has been played `min_plays`
+    times; the least recently played files are evicted to stay under `max_bytes`.
+    Play counts are kept for the `max_tracked` most recently played videos only.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, min_plays: int = 3, max_tracked: int = 10000):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_plays = min_plays
+        self.max_tracked = max_tracked
+        self._plays: OrderedDict[str, int] = OrderedDict()  # video_id -> play count, LRU order
+        self._encoding = set()
+        self._encode_lock = asyncio.Lock()  # one background encode at a time
+        self._index: OrderedDict[str, int] = OrderedDict()  # video_id -> file size, LRU order
+        self._total_bytes = 0  # Running sum of the index sizes
+        self._load_index()
+
+    def _load_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.part'):
+                os.remove(path)  # leftovers of an interrupted encode
+            elif name.endswith('.opus'):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name[:-len('.opus')], stat.st_size))
+
+        # The file mtime is touched on every hit, so it gives back the LRU order
+        for _, video_id, size in sorted(files):
+            self._index[video_id] = size
+            self._total_bytes += size
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def path_for(self, video_id: str) -> str:
+        # video ids are used as file names, keep them safe
+        return os.path.join(self.directory, re.sub(r'[^A-Za-z0-9_-]', '_', video_id) + '.opus')
+
+    def contains(self, video_id: str | None) -> bool:
+        """Whether a video is cached, without marking it recently used (for songs that may never play)."""
+        return bool(video_id) and video_id in self._index
+
+    def lookup(self, video_id: str | None) -> str | None:
+        """Return the cached file for a video (marking it recently used), or None."""
+        if not video_id or video_id not in self._index:
+            return None
+        path = self.path_for(video_id)
+        if not os.path.exists(path):
+            self._total_bytes -= self._index.pop(video_id)
+            return None
+
+        self._index.move_to_end(video_id)
+        os.utime(path)
+        return path
+
+    def record_play(self, track_info: TrackInfo, gain_db: float | None = None):
+        """Count a play and start filling the cache once the track is hot enough."""
+        video_id = track_info.id
+        if not video_id:
+            return
+
+        self._plays[video_id] = self._plays.get(video_id, 0) + 1
+        self._plays.move_to_end(video_id)
+        if len(self._plays) > self.max_tracked:
+            self._plays.popitem(last=False)
+        if (
+            self._plays[video_id] >= self.min_plays
+            and video_id not in self._index
+            and video_id not in self._encoding
+        ):
+            self._encoding.add(video_id)
+            asyncio.get_running_loop().create_task(self._fill(video_id, track_info.url, track_info.title, gain_db))
+
+    async def _fill(self, video_id: str, url: str, title: str, gain_db: float | None):
+        final_path = self.path_for(video_id)
+        tmp_path = f"{final_path}.part"
+        audio_filter = (
+            f'volume={gain_db:.2f}dB' if gain_db is not None
+            else f'loudnorm=I={TARGET_LUFS}:TP={TARGET_TRUE_PEAK}:LRA=11'
+        )
+
+        try:
+            async with self._encode_lock:
+                process = await asyncio.create_subprocess_exec(
+                    *niced(10), 'ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error', '-y',
+                    '-reconnect', '1', '-reconnect_streamed', '1', '-reconnect_delay_max', '2',
+                    '-i', url, '-vn', '-af', audio_filter,
+                    # Same output shape FFmpegOpusAudio produces, so packets can be sent as-is
+                    '-c:a', 'libopus', '-b:a', '128k', '-ar', '48000', '-ac', '2',
+                    '-f', 'opus', tmp_path,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                _, stderr = await process.communicate()
+
+            if process.returncode != 0:
+                print(f"Error caching {title}: {stderr.decode(errors='ignore').strip()}")
+                return
+
+            # Only a complete file ever appears under the final name
+            os.replace(tmp_path, final_path)
+            size = os.path.getsize(final_path)
+            self._total_bytes += size - self._index.get(video_id, 0)
+            self._index[video_id] = size
+            self._evict()
+            print(f"Cached audio for {title}")
+        except Exception as e:
+            print(f"Error caching {title}: {e}")
+        finally:
+            self._encoding.discard(video_id)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _evict(self):
+        while self._index and self.total_bytes > self.max_bytes:
+            video_id, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self.path_for(video_id))
+            except FileNotFoundError:
+                pass
+            print(f"Evicted cached audio: {video_id}")
@@ -0,0 +1,102 @@
+# apps/extract_cache.py
+import re
+import time
+import urllib.parse
+from collections import OrderedDict
+
+# Matches the 11 character video id in the common YouTube url shapes
+# (watch?v=, youtu.be/, shorts/, embed/, live/, music.youtube.com)
+YOUTUBE_ID_PATTERN = re.compile(
+    r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/)|youtu\.be/)([A-Za-z0-9_-]{11})'
+)
+
+
+def get_cache_key(url: str) -> str:
+    """
+    Return a canonical key for a url, so the same video requested through
+    different links (youtu.be, shorts, extra query params) shares one entry.
+    Non-YouTube urls fall back to the url itself.
+    """
+    if match := YOUTUBE_ID_PATTERN.search(url):
+        return f"youtube:{match.group(1)}"
+    return url.strip()
+
+
+def get_stream_expiry(stream_url: str | None) -> float | None:
+    """Read the unix timestamp from the signed stream url's `expire=` parameter."""
+    if not stream_url:
+        return None
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(stream_url).query)
+    if 'expire' in query:
+        try:
+            return float(query['expire'][0])
+        except ValueError:
+            return None
+
+    # googlevideo sometimes puts the parameters in the path (/expire/123456/...)
+    if match := re.search(r'/expire/(\d+)', stream_url):
+        return float(match.group(1))
+    return None
+
+
+class ExtractCache:
+    """
+    LRU cache of yt-dlp extraction results (the song_info fields).
+
+    Entries are evicted when the cache is full (least recently used first)
+    or once the signed stream url is about to expire.
+    """
+
+    def __init__(self, max_size: int = 512, default_ttl: float = 3600, expiry_margin: float = 300):
+        """
+        Args:
+            max_size (int): Maximum number of songs kept in the cache.
+            default_ttl (float): Lifetime in seconds for urls without an `expire=` parameter.
+            expiry_margin (float): Seconds before the url expiry at which the entry is dropped,
+                so a cached url is never handed to FFmpeg right before it dies.
+        """
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.expiry_margin = expiry_margin
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> dict | None:
+        """Return a copy of the cached song_info, or None if missing/expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, song_info = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(song_info)
+
+    def set(self, key: str, song_info: dict):
+        """Store song_info, with its lifetime taken from the stream url."""
+        expire = get_stream_expiry(song_info.get('url'))
+        if expire is not None:
+            expires_at = expire - self.expiry_margin
+        else:
+            expires_at = time.time() + self.default_ttl
+
+        if expires_at <= time.time():
+            return  # Already too close to expiry to be worth caching
+
+        self._entries[key] = (expires_at, dict(song_info))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,143 @@
+# apps/extract_pool.py
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import yt_dlp
+
+# ---------------------- Worker side ----------------------
+# Every worker (thread or process) builds its own YoutubeDL instances, one per
+# option profile, because a YoutubeDL object is not safe to share between threads.
+
+_worker_state = threading.local()
+
+
+def _init_worker(profiles: dict):
+    _worker_state.profiles = profiles
+    _worker_state.instances = {}
+
+
+def _get_ytdl(profile: str) -> yt_dlp.YoutubeDL:
+    instances = _worker_state.instances
+    if profile not in instances:
+        instances[profile] = yt_dlp.YoutubeDL(_worker_state.profiles[profile])
+    return instances[profile]
+
+
+def _extract(url: str, profile: str, overrides: dict | None) -> dict:
+    ytdl = _get_ytdl(profile)
+
+    # The instance belongs to this worker only, so per-call params can be
+    # swapped in and restored without affecting other jobs
+    overrides = overrides or {}
+    previous = {key: ytdl.params[key] for key in overrides if key in ytdl.params}
+    ytdl.params.update(overrides)
+    try:
+        data = ytdl.extract_info(url, download=False)
+    finally:
+        for key in overrides:
+            if key in previous:
+                ytdl.params[key] = previous[key]
+            else:
+                ytdl.params.pop(key, None)  # Absent before, an explicit None could mean something else
+
+    # Make sure the result can travel back from a worker process
+    return ytdl.sanitize_info(data)
+
+
+# ---------------------- Pool ----------------------
+
+class ExtractPool:
+    """
+    Bounded pool of yt-dlp workers, separate from the default executor.
+
+    mode="thread" runs jobs in a thread pool, mode="process" in a process pool
+    so CPU-heavy extraction is not held back by the GIL.
+    """
+
+    def __init__(self, profiles: dict, mode: str = "thread", workers: int = 4, max_queue: int = 32):
+        """
+        Args:
+            profiles (dict): Named yt-dlp option sets, e.g. {"default": yt_dl_options}.
+            mode (str): "thread" or "process".
+            workers (int): Number of workers, each with its own YoutubeDL instances.
+            max_queue (int): Maximum jobs submitted at once; further callers wait their turn.
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown extraction pool mode: {mode}")
+
+        self.profiles = profiles
+        self.mode = mode
+        self.workers = workers
+        self.max_queue = max(max_queue, workers)
+        self._executor = None
+        self._slots = None
+        self._waiting = 0
+        self._running = 0
+        self.latencies = deque(maxlen=200)  # seconds per finished job
+
+    def _get_executor(self):
+        # Created on first use so importing this module does not spawn anything
+        if self._executor is None:
+            if self.mode == "process":
+                # spawn instead of fork: the bot process runs an event loop and voice threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.profiles,),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="ytdl",
+                    initializer=_init_worker,
+                    initargs=(self.profiles,),
+                )
+        return self._executor
+
+    async def extract_info(self, url: str, profile: str = "default", overrides: dict | None = None) -> dict:
+        """Run `YoutubeDL.extract_info(url, download=False)` on a pool worker."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_queue)
+
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self._running += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), _extract, url, profile, overrides)
+        finally:
+            self._running -= 1
+            self.latencies.append(time.perf_counter() - started)
+            self._slots.release()
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a worker, including the ones held back by max_queue."""
+        return self._waiting + max(0, self._running - self.workers)
+
+    def stats(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            'mode': self.mode,
+            'workers': self.workers,
+            'running': min(self._running, self.workers),
+            'queue_depth': self.queue_depth,
+            'avg_latency': sum(latencies) / len(latencies) if latencies else 0.0,
+            'p95_latency': latencies[max(0, int(len(latencies) * 0.95) - 1)] if latencies else 0.0,
+        }
+
+    def shutdown(self):
+        """Stop the workers (process workers included); the next job starts a fresh executor."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
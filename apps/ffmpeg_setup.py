@@ -4,12 +4,16 @@
 # ytdl = None  # Will be initialized in main.py
 # ffmpeg_options = {'options': '-vn'}
 
-import yt_dlp
+import os
+
+from apps.extract_pool import ExtractPool
+from apps.track import TrackInfo
 
 # yt_dl_options = {"format": "bestaudio/best"}
 # In ffmpeg_setup.py
 yt_dl_options = {
-    'format': 'bestaudio/best',
+    # Prefer Opus-native formats (webm itag 251) so playback can skip re-encoding
+    'format': 'bestaudio[acodec=opus]/bestaudio/best',
     'noplaylist': True,
     'quiet': True,
     'no_warnings': True,
@@ -21,7 +25,22 @@ yt_dl_options = {
         'preferredquality': '192',
     }],
 }
-ytdl = yt_dlp.YoutubeDL(yt_dl_options)
+# Flat listing of playlists: only ids/titles, stream urls are resolved later
+yt_dl_playlist_options = {
+    **yt_dl_options,
+    'noplaylist': False,
+    'extract_flat': 'in_playlist',
+    'lazy_playlist': True,  # stop fetching once the requested playlist_items are listed
+}
+
+# Dedicated extraction pool, every worker gets its own YoutubeDL instance
+# EXTRACT_POOL_MODE: "thread" (default) or "process"
+extract_pool = ExtractPool(
+    profiles={'default': yt_dl_options, 'playlist': yt_dl_playlist_options},
+    mode=os.getenv('EXTRACT_POOL_MODE', 'thread'),
+    workers=int(os.getenv('EXTRACT_POOL_WORKERS', 4)),
+    max_queue=int(os.getenv('EXTRACT_POOL_MAX_QUEUE', 32)),
+)
 voice_client_dict = {}
 ffmpeg_options = {
     'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 2',
@@ -33,5 +52,41 @@ ffmpeg_options = {
     # LRA=11: Loudness range target, keeping the audio dynamic but within acceptable levels
 }   
 
+# PLAYBACK_MODE: "transcode" (default) always re-encodes with loudnorm,
+# "passthrough" copies Opus streams as-is and only transcodes when needed
+PLAYBACK_MODE = os.getenv('PLAYBACK_MODE', 'transcode')
+# Largest precomputed gain (dB) still played in passthrough, since codec copy cannot apply gain
+PASSTHROUGH_GAIN_TOLERANCE = float(os.getenv('PASSTHROUGH_GAIN_TOLERANCE', 2.0))
+
+
+def build_ffmpeg_options(track_info: TrackInfo, gain_db: float | None = None) -> dict:
+    """
+    Pick the FFmpegOpusAudio arguments for a song.
+
+    - passthrough: Opus source and no (significant) precomputed gain -> codec copy, no decoding
+    - precomputed gain (gain_db) -> cheap static volume filter instead of loudnorm
+    - otherwise -> the default loudnorm transcode
+    """
+    if PLAYBACK_MODE == 'passthrough' and track_info.acodec == 'opus':
+        if gain_db is None or abs(gain_db) <= PASSTHROUGH_GAIN_TOLERANCE:
+            return {
+                'before_options': ffmpeg_options['before_options'],
+                'options': '-vn',
+                'codec': 'copy',
+            }
+
+    if gain_db is not None:
+        return {
+            'before_options': ffmpeg_options['before_options'],
+            'options': f'-vn -af volume={gain_db:.2f}dB',
+        }
+
+    return dict(ffmpeg_options)
+
+
 music_queue = {}  # Dictionary to store queues for each guild
-timeout_timers = {}  # Dictionary to store timers for each voice channel
\ No newline at end of file
+timeout_timers = {}  # Dictionary to store timers for each voice channel
+prefetch_tasks = {}  # Dictionary to store next-song prefetch tasks for each voice channel
+ingest_tasks = {}  # Dictionary to store background playlist ingestion tasks for each voice channel
+players = {}  # Dictionary to store the GuildPlayer (playback actor) of each voice channel
+warm_sources = {}  # Dictionary to store the pre-spawned FFmpeg source of the next song for each voice channel
\ No newline at end of file
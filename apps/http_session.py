@@ -0,0 +1,24 @@
+# apps/http_session.py
+import aiohttp
+
+# One pooled aiohttp session for the bot's own HTTP calls (stream probes,
+# API requests), so connections and DNS lookups are reused between requests.
+_session: aiohttp.ClientSession | None = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the shared session, creating it on first use (needs a running loop)."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=15),
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
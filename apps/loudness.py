@@ -0,0 +1,102 @@
+# apps/loudness.py
+import asyncio
+import json
+import re
+import shutil
+import time
+
+from apps.track import TrackInfo
+from utils.json_store import JsonStore
+
+# Same targets as the loudnorm filter in ffmpeg_setup.ffmpeg_options
+TARGET_LUFS = -16.0
+TARGET_TRUE_PEAK = -1.5
+
+
+def niced(niceness: int) -> list[str]:
+    """
+    Command prefix running a subprocess at a lower CPU priority. Done with
+    nice(1) rather than preexec_fn, which isn't safe to fork from a threaded process.
+    """
+    return ['nice', '-n', str(niceness)] if shutil.which('nice') else []
+
+
+def compute_gain(measurement: dict) -> float:
+    """Static gain (dB) that brings a track to TARGET_LUFS without pushing peaks over TARGET_TRUE_PEAK."""
+    gain = TARGET_LUFS - measurement['integrated']
+    gain = min(gain, TARGET_TRUE_PEAK - measurement['true_peak'])
+    return round(gain, 2)
+
+
+class LoudnessAnalyzer:
+    """
+    Measures integrated loudness and true peak once per video id, in the
+    background and at low CPU priority, and keeps the results in a JSON file.
+    """
+
+    def __init__(self, path: str = 'loudness.json'):
+        self.store = JsonStore(path)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._pending = set()
+        self._worker = None
+
+    def get_gain(self, video_id: str | None) -> float | None:
+        """Return the precomputed gain for a video, or None if it wasn't measured yet."""
+        if not video_id or not (measurement := self.store.get(video_id)):
+            return None
+        return compute_gain(measurement)
+
+    def enqueue(self, track_info: TrackInfo):
+        """Schedule a song for analysis unless it's already measured or waiting."""
+        video_id = track_info.id
+        if not video_id or not track_info.url or video_id in self.store or video_id in self._pending:
+            return
+
+        self._pending.add(video_id)
+        self._queue.put_nowait((video_id, track_info))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        # A single worker: analysis is a background job and must not compete with playback
+        while True:
+            video_id, track_info = await self._queue.get()
+            try:
+                if measurement := await self.measure(track_info.url):
+                    measurement['measured_at'] = int(time.time())
+                    self.store.set(video_id, measurement)
+                    print(f"Measured loudness of {track_info.title}: {measurement}")
+            except Exception as e:
+                print(f"Error measuring loudness of {track_info.title}: {e}")
+            finally:
+                self._pending.discard(video_id)
+
+    async def measure(self, url: str) -> dict | None:
+        """Run a loudnorm analysis pass (no output) over the stream at the lowest CPU priority."""
+        process = await asyncio.create_subprocess_exec(
+            *niced(19), 'ffmpeg', '-hide_banner', '-nostats',
+            '-reconnect', '1', '-reconnect_streamed', '1', '-reconnect_delay_max', '2',
+            '-i', url, '-vn',
+            '-af', f'loudnorm=I={TARGET_LUFS}:TP={TARGET_TRUE_PEAK}:LRA=11:print_format=json',
+            '-f', 'null', '-',
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            return None
+
+        # loudnorm prints its measurement as the last JSON object on stderr
+        match = re.search(r'\{[^{}]*"input_i"[^{}]*\}', stderr.decode(errors='ignore'))
+        if not match:
+            return None
+        stats = json.loads(match.group(0))
+        try:
+            integrated = float(stats['input_i'])
+            true_peak = float(stats['input_tp'])
+        except (KeyError, ValueError):
+            return None
+        if integrated == float('-inf'):
+            return None  # Silence, nothing to normalize
+
+        return {'integrated': integrated, 'true_peak': true_peak}
@@ -0,0 +1,119 @@
+# apps/lyrics_service.py
+import asyncio
+import re
+import time
+from collections import OrderedDict
+
+import lyricsgenius
+
+from apps.single_flight import SingleFlight
+from utils.json_store import JsonStore
+from utils.query_utils import normalize_query
+
+# "(Official Video)", "[Lyrics]", "| Official Audio"... aren't part of the song title
+TITLE_NOISE_PATTERN = re.compile(r'[\(\[][^\)\]]*[\)\]]|\|.*$', re.IGNORECASE)
+
+
+def clean_title(title: str) -> str:
+    return TITLE_NOISE_PATTERN.sub('', title).strip() or title
+
+
+class LyricsService:
+    """
+    Async lyrics lookups backed by an in-memory LRU and a persistent JSON cache,
+    keyed by the normalized title and artist.
+
+    The blocking lyricsgenius search runs in the executor, and identical lookups
+    running at the same time share one search.
+    """
+
+    def __init__(self, access_token: str, path: str = 'lyrics_cache.json',
+                 max_size: int = 256, max_stored: int = 5000, miss_ttl: float = 3600):
+        self.access_token = access_token
+        self.max_size = max_size
+        self.max_stored = max_stored
+        self.miss_ttl = miss_ttl
+        self._genius = None
+        self._memory: OrderedDict[str, dict] = OrderedDict()
+        self._misses: dict[str, float] = {}  # key -> time until which "not found" is remembered
+        self._inflight = SingleFlight()
+        self.store = JsonStore(path)
+
+    @property
+    def genius(self) -> lyricsgenius.Genius:
+        if self._genius is None:
+            self._genius = lyricsgenius.Genius(self.access_token, verbose=False)
+        return self._genius
+
+    @staticmethod
+    def make_key(title: str, artist: str | None = None) -> str:
+        return f"{normalize_query(artist or '')}|{normalize_query(clean_title(title))}"
+
+    def get_cached(self, title: str, artist: str | None = None) -> dict | None:
+        key = self.make_key(title, artist)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if record := self.store.get(key):
+            self._remember(key, record)
+            return record
+        return None
+
+    async def get(self, title: str, artist: str | None = None) -> dict | None:
+        """
+        Return {'title', 'url', 'thumbnail', 'lyrics'} for a song, or None if Genius has nothing.
+        """
+        if record := self.get_cached(title, artist):
+            return record
+
+        key = self.make_key(title, artist)
+        if self._misses.get(key, 0) > time.time():
+            return None
+        return await self._inflight.do(key, lambda: self._fetch(key, title, artist))
+
+    def prefetch(self, title: str, artist: str | None = None):
+        """Look the lyrics up in the background so a later `lyrics` call returns immediately."""
+        if self.get_cached(title, artist):
+            return
+
+        async def prefetch_task():
+            try:
+                await self.get(title, artist)
+            except Exception as e:
+                print(f"Error prefetching lyrics for {title}: {e}")
+
+        asyncio.get_running_loop().create_task(prefetch_task())
+
+    async def _fetch(self, key: str, title: str, artist: str | None) -> dict | None:
+        loop = asyncio.get_running_loop()
+        song = await loop.run_in_executor(
+            None, lambda: self.genius.search_song(title=clean_title(title), artist=artist or '')
+        )
+        if not song:
+            self._misses[key] = time.time() + self.miss_ttl
+            return None
+
+        record = {
+            'title': song.title,
+            'url': song.url,
+            'thumbnail': song.song_art_image_thumbnail_url,
+            'lyrics': song.lyrics,
+            'cached_at': int(time.time()),
+        }
+        self._remember(key, record)
+        self.store.set(key, record)
+        self._trim_store()
+        return record
+
+    def _remember(self, key: str, record: dict):
+        self._memory[key] = record
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _trim_store(self):
+        if len(self.store) <= self.max_stored:
+            return
+        oldest = sorted(self.store.items(), key=lambda item: item[1].get('cached_at', 0))
+        for key, _ in oldest[:len(self.store) - self.max_stored]:
+            self.store.pop(key)
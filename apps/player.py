@@ -0,0 +1,191 @@
+# apps/player.py
+import asyncio
+import enum
+import time
+from collections import deque
+
+from apps.ffmpeg_setup import music_queue, voice_client_dict
+
+
+class PlayerState(enum.Enum):
+    IDLE = "idle"          # Connected (or not yet), nothing playing
+    STARTING = "starting"  # Resolving and spawning the current song
+    PLAYING = "playing"
+    PAUSED = "paused"
+    STOPPED = "stopped"    # Disconnected, the player is finished
+
+
+class PlayerCommand(enum.Enum):
+    PLAY = "play"                # Start the current song if nothing is playing
+    TRACK_ENDED = "track_ended"  # Posted by the voice thread, with the track's generation
+    SKIP = "skip"
+    PAUSE = "pause"
+    RESUME = "resume"
+    PRUNE = "prune"
+    STOP = "stop"
+
+
+# Allowed state changes, anything else is a bug and gets logged
+TRANSITIONS = {
+    PlayerState.IDLE: {PlayerState.STARTING, PlayerState.STOPPED},
+    PlayerState.STARTING: {PlayerState.PLAYING, PlayerState.IDLE, PlayerState.STOPPED},
+    PlayerState.PLAYING: {PlayerState.PAUSED, PlayerState.STARTING, PlayerState.STOPPED},
+    PlayerState.PAUSED: {PlayerState.PLAYING, PlayerState.STARTING, PlayerState.STOPPED},
+    PlayerState.STOPPED: set(),
+}
+
+
+class GuildPlayer:
+    """
+    Actor owning the playback of one voice channel.
+
+    Every transition (track ended, skip, qplay, pause, stop, prune) is a
+    command on one asyncio queue, handled one at a time by a single task, so
+    they can never interleave. Each started track gets a new generation; the
+    voice thread's after-callback reports the generation it was created for,
+    so a late "track ended" from a skipped track can't pop the queue twice.
+    """
+
+    def __init__(self, voice_channel, text_channel, music_cog):
+        self.voice_channel = voice_channel
+        self.text_channel = text_channel
+        self.music_cog = music_cog
+        self.state = PlayerState.IDLE
+        self.generation = 0
+        self.now_playing = None  # The queue entry actually playing, so only that one is ever popped
+        # Seconds from a transition request (track ended, skip, play) to the next song playing
+        self.transition_times = deque(maxlen=100)
+        self._loop = asyncio.get_running_loop()
+        self._commands: asyncio.Queue = asyncio.Queue()
+        self._task = self._loop.create_task(self._run())
+
+    @property
+    def finished(self) -> bool:
+        return self._task.done()
+
+    def submit(self, command: PlayerCommand, generation: int | None = None) -> asyncio.Future:
+        """Queue a command; the returned future resolves to the state once it has been handled."""
+        future = self._loop.create_future()
+        if self.finished:
+            future.set_result(self.state)
+        else:
+            self._commands.put_nowait((command, generation, future, time.perf_counter()))
+        return future
+
+    def make_after_callback(self, generation: int):
+        """The `after=` callback for voice_client.play(), runs on the voice thread."""
+        def after_playing(error):
+            if error:
+                print(f"Error during playback in {self.voice_channel.name}: {error}")
+            self._loop.call_soon_threadsafe(self.submit, PlayerCommand.TRACK_ENDED, generation)
+        return after_playing
+
+    def cancel(self):
+        self._task.cancel()
+
+    def _set_state(self, state: PlayerState):
+        if state is not self.state and state not in TRANSITIONS[self.state]:
+            print(f"Unexpected player transition in {self.voice_channel.name}: {self.state.value} -> {state.value}")
+        self.state = state
+
+    async def _run(self):
+        try:
+            while self.state is not PlayerState.STOPPED:
+                command, generation, future, submitted = await self._commands.get()
+                try:
+                    await self._handle(command, generation, submitted)
+                except Exception as e:
+                    print(f"Error handling {command.value} in {self.voice_channel.name}: {e}")
+                finally:
+                    if not future.done():
+                        future.set_result(self.state)
+        finally:
+            # Nobody should wait forever on a finished player
+            while not self._commands.empty():
+                _, _, future, _ = self._commands.get_nowait()
+                if not future.done():
+                    future.set_result(self.state)
+
+    async def _handle(self, command: PlayerCommand, generation: int | None, submitted: float):
+        voice_client = voice_client_dict.get(self.voice_channel.id)
+
+        if command is PlayerCommand.PLAY:
+            if self.state is PlayerState.IDLE:
+                await self._start_current(submitted)
+
+        elif command is PlayerCommand.TRACK_ENDED:
+            # Ignore callbacks of tracks that were already skipped or stopped
+            if generation == self.generation and self.state in (PlayerState.PLAYING, PlayerState.PAUSED):
+                await self._advance(submitted)
+
+        elif command is PlayerCommand.SKIP:
+            if self.state in (PlayerState.PLAYING, PlayerState.PAUSED):
+                await self._advance(submitted)
+
+        elif command is PlayerCommand.PAUSE:
+            if self.state is PlayerState.PLAYING and voice_client:
+                voice_client.pause()
+                self._set_state(PlayerState.PAUSED)
+
+        elif command is PlayerCommand.RESUME:
+            if self.state is PlayerState.PAUSED and voice_client:
+                voice_client.resume()
+                self._set_state(PlayerState.PLAYING)
+
+        elif command is PlayerCommand.PRUNE:
+            # The playing song plays out, nothing comes after it
+            if queue := music_queue.get(self.voice_channel.id):
+                queue.clear()
+
+        elif command is PlayerCommand.STOP:
+            self.generation += 1  # The after-callback of the stopped track is stale now
+            await self.music_cog.cancel_prefetch_timer(self.voice_channel)
+            # After the prefetch is cancelled, so it can't register a new one behind us
+            self.music_cog.discard_warm_source(self.voice_channel.id)
+            voice_client = voice_client_dict.pop(self.voice_channel.id, None)
+            if voice_client and voice_client.is_connected():
+                await voice_client.disconnect()
+            self._set_state(PlayerState.STOPPED)
+
+    async def _advance(self, submitted: float):
+        """Drop the current song and start the next one."""
+        self.generation += 1
+        voice_client = voice_client_dict.get(self.voice_channel.id)
+        if voice_client and (voice_client.is_playing() or voice_client.is_paused()):
+            voice_client.stop()
+        await self.music_cog.cancel_prefetch_timer(self.voice_channel)
+
+        # After a prune the queue head may be a newer song, which must not be dropped
+        queue = music_queue.get(self.voice_channel.id)
+        if queue and queue.current is self.now_playing:
+            queue.pop_current()
+        self.now_playing = None
+        await self._start_current(submitted)
+
+    async def _start_current(self, submitted: float):
+        self._set_state(PlayerState.STARTING)
+        queue = music_queue.get(self.voice_channel.id)
+        try:
+            while queue:
+                self.generation += 1
+                after = self.make_after_callback(self.generation)
+                if await self.music_cog.start_track(self.voice_channel, self.text_channel, after):
+                    self.now_playing = queue.current
+                    self.transition_times.append(time.perf_counter() - submitted)
+                    self._set_state(PlayerState.PLAYING)
+                    return
+                queue.pop_current()  # Unplayable, try the next one
+        except asyncio.CancelledError:
+            if self._task.cancelling():
+                raise  # The player itself is being cancelled
+            # A stray cancellation from an awaited helper must not kill the actor mid-STARTING
+            print(f"Start of next song cancelled in {self.voice_channel.name}")
+            self._set_state(PlayerState.IDLE)
+            return
+        except Exception as e:
+            print(f"Error playing next song in {self.voice_channel.name}: {e}")
+            self._set_state(PlayerState.IDLE)
+            return
+
+        self._set_state(PlayerState.IDLE)
+        await self.music_cog.on_queue_finished(self.voice_channel)
@@ -0,0 +1,79 @@
+# apps/playlist.py
+import re
+import urllib.parse
+
+from apps.ffmpeg_setup import extract_pool
+from apps.track import TrackInfo
+
+
+def is_playlist_url(url: str) -> bool:
+    """True for YouTube playlist pages (youtube.com/playlist?list=...)."""
+    parsed = urllib.parse.urlparse(url)
+    return (
+        parsed.netloc.endswith('youtube.com')
+        and parsed.path.rstrip('/') == '/playlist'
+        and 'list' in urllib.parse.parse_qs(parsed.query)
+    )
+
+
+SPOTIFY_URL_PATTERN = re.compile(r'spotify\.com/(?:intl-[\w-]+/)?(track|album|playlist)/([A-Za-z0-9]+)')
+
+
+def parse_spotify_url(url: str) -> tuple[str, str] | None:
+    """Return (kind, id) for Spotify track/album/playlist links, e.g. ('album', '4aawyAB9vmqN3uQ7FjRGTy')."""
+    if match := SPOTIFY_URL_PATTERN.search(url):
+        return match.group(1), match.group(2)
+    return None
+
+
+def search_entry_to_track_info(entry: dict) -> TrackInfo:
+    """Turn a YouTube search result into track metadata whose stream url is resolved later."""
+    return TrackInfo.intern(
+        id=entry['id'],
+        title=entry['title'],
+        webpage_url=entry['url'],
+        duration=entry.get('duration') or 0,
+        thumbnail=entry.get('thumbnail'),
+    )
+
+
+def flat_entry_to_track_info(entry: dict) -> TrackInfo:
+    """
+    Turn a flat playlist entry into track metadata. The stream url is left
+    unresolved, it gets resolved from webpage_url when the song nears the head
+    of the queue (prefetch) or at the latest right before it plays.
+    """
+    thumbnails = entry.get('thumbnails') or []
+    return TrackInfo.intern(
+        id=entry['id'],
+        title=entry.get('title') or 'Unknown Title',
+        webpage_url=f"https://www.youtube.com/watch?v={entry['id']}",
+        duration=entry.get('duration') or 0,
+        thumbnail=thumbnails[-1]['url'] if thumbnails else None,
+    )
+
+
+async def iter_playlist_pages(url: str, page_size: int = 50, max_tracks: int = 500):
+    """
+    Async generator listing a playlist page by page with flat extraction.
+
+    Yields:
+        tuple[str | None, list[TrackInfo]]: (playlist title, tracks of the page)
+    """
+    start = 1
+    while start <= max_tracks:
+        end = min(start + page_size - 1, max_tracks)
+        data = await extract_pool.extract_info(
+            url,
+            profile='playlist',
+            overrides={'playlist_items': f'{start}-{end}'},
+        )
+        entries = [entry for entry in data.get('entries') or [] if entry and entry.get('id')]
+        if not entries:
+            return
+
+        yield data.get('title'), [flat_entry_to_track_info(entry) for entry in entries]
+
+        if len(entries) < end - start + 1:
+            return  # Last page
+        start = end + 1
@@ -0,0 +1,535 @@
+# apps/queue_engine.py
+import itertools
+import random
+from collections import deque
+from itertools import islice
+
+# Versions are unique across all queues, so a (queue, version) pair never repeats
+_versions = itertools.count(1)
+
+
+# ---------------------- Duration index ----------------------
+# Implicit treap: nodes are ordered by queue position (no keys), and every node
+# keeps the size and the summed durations of its subtree. A Fenwick tree gives
+# the same O(log n) prefix sums but only over fixed positions; inserting in the
+# middle (qplay, move) would shift every later position and force an O(n)
+# rebuild, which the treap handles with a split and a merge.
+
+class _Node:
+    __slots__ = ('value', 'total', 'size', 'priority', 'left', 'right')
+
+    def __init__(self, value: float):
+        self.value = self.total = value
+        self.size = 1
+        self.priority = random.random()
+        self.left = self.right = None
+
+
+def _size(node: _Node | None) -> int:
+    return node.size if node else 0
+
+
+def _total(node: _Node | None) -> float:
+    return node.total if node else 0
+
+
+def _update(node: _Node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+    node.total = node.value + _total(node.left) + _total(node.right)
+
+
+def _split(node: _Node | None, k: int) -> tuple[_Node | None, _Node | None]:
+    """Split into (first k positions, the rest)."""
+    if node is None:
+        return None, None
+    if _size(node.left) >= k:
+        left, node.left = _split(node.left, k)
+        _update(node)
+        return left, node
+    node.right, right = _split(node.right, k - _size(node.left) - 1)
+    _update(node)
+    return node, right
+
+
+def _merge(left: _Node | None, right: _Node | None) -> _Node | None:
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+class DurationIndex:
+    """
+    Positional sequence of durations with O(log n) insert/pop at any position
+    and O(log n) prefix sums, i.e. "how long until position i plays".
+    """
+
+    def __init__(self, values=()):
+        self._root = self._build(values)
+
+    @staticmethod
+    def _build(values) -> _Node | None:
+        # O(n) construction of the treap for a known order (Cartesian tree on a stack)
+        stack = []
+        for value in values:
+            node = _Node(value)
+            last = None
+            while stack and stack[-1].priority < node.priority:
+                last = stack.pop()
+                _update(last)
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            stack.append(node)
+        while len(stack) > 1:
+            _update(stack.pop())
+        if stack:
+            _update(stack[0])
+            return stack[0]
+        return None
+
+    def __len__(self):
+        return _size(self._root)
+
+    @property
+    def total(self) -> float:
+        return _total(self._root)
+
+    def insert(self, index: int, value: float):
+        left, right = _split(self._root, index)
+        self._root = _merge(_merge(left, _Node(value)), right)
+
+    def pop(self, index: int) -> float:
+        left, right = _split(self._root, index)
+        node, right = _split(right, 1)
+        self._root = _merge(left, right)
+        return node.value
+
+    def prefix_sum(self, k: int) -> float:
+        """Sum of the first k durations."""
+        node, total = self._root, 0
+        while node is not None and k > 0:
+            left_size = _size(node.left)
+            if k <= left_size:
+                node = node.left
+            else:
+                total += _total(node.left) + node.value
+                k -= left_size + 1
+                node = node.right
+        return total
+
+
+def _duration(song) -> float:
+    return song.duration or 0
+
+
+class MusicQueue:
+    """
+    Song queue of a voice channel. Index 0 is the song currently playing,
+    everything after it is upcoming.
+
+    Backed by a deque: removing the current song and pushing a song right after
+    it (qplay) are O(1); removing/moving by index shifts from the nearest end
+    (O(min(i, n - i))) instead of the whole list, and iteration never copies.
+
+    `version` changes on every mutation, so views derived from the queue
+    (e.g. rendered queue pages) know when they are stale. A DurationIndex kept
+    in step with the songs answers wait times in O(log n).
+    """
+
+    def __init__(self, songs=(), weights: dict | None = None):
+        self._songs = deque(songs)
+        # Fair-queueing weights (requester_id -> songs per turn), unused here but
+        # kept so switching to FairMusicQueue and back doesn't lose them
+        self.weights = dict(weights or {})
+        self._durations = DurationIndex(_duration(song) for song in self._songs)
+        self.version = next(_versions)
+
+    def _touch(self):
+        self.version = next(_versions)
+
+    def __len__(self):
+        return len(self._songs)
+
+    def __iter__(self):
+        return iter(self._songs)
+
+    def __getitem__(self, index: int):
+        return self._songs[index]
+
+    @property
+    def current(self):
+        """The song playing now, or None if the queue is empty."""
+        return self._songs[0] if self._songs else None
+
+    @property
+    def next_song(self):
+        """The song that plays after the current one, or None."""
+        return self._songs[1] if len(self._songs) > 1 else None
+
+    def upcoming(self, start: int = 0, stop: int | None = None):
+        """Iterate the songs after the current one (upcoming[start:stop]) without copying."""
+        return islice(self._songs, start + 1, None if stop is None else stop + 1)
+
+    def index(self, song) -> int:
+        """Position of `song` (by identity); searched from the end, where appended songs are."""
+        for index in range(len(self._songs) - 1, -1, -1):
+            if self._songs[index] is song:
+                return index
+        raise ValueError("song is not in the queue")
+
+    def wait_time(self, index: int) -> float:
+        """Seconds of music before the song at `index` starts, counting the whole current song."""
+        return self._durations.prefix_sum(index)
+
+    @property
+    def total_duration(self) -> float:
+        return self._durations.total
+
+    def append(self, song):
+        self._songs.append(song)
+        self._durations.insert(len(self._songs) - 1, _duration(song))
+        self._touch()
+
+    def push_next(self, song):
+        """Put a song right after the current one (qplay)."""
+        self._touch()
+        self._durations.insert(min(1, len(self._songs)), _duration(song))
+        if not self._songs:
+            self._songs.append(song)
+            return
+        current = self._songs.popleft()
+        self._songs.appendleft(song)
+        self._songs.appendleft(current)
+
+    def pop_current(self):
+        """Remove and return the current song, or None if the queue is empty."""
+        if not self._songs:
+            return None
+        self._touch()
+        self._durations.pop(0)
+        return self._songs.popleft()
+
+    def remove(self, index: int):
+        """Remove and return the song at `index` (0 is the current song)."""
+        song = self._songs[index]
+        del self._songs[index]
+        self._durations.pop(index % (len(self._songs) + 1))
+        self._touch()
+        return song
+
+    def move(self, src: int, dst: int):
+        """Move the song at `src` to position `dst`."""
+        song = self.remove(src)
+        self._songs.insert(dst, song)
+        self._durations.insert(dst, _duration(song))
+
+    def clear(self):
+        self._songs.clear()
+        self._durations = DurationIndex()
+        self._touch()
+
+    # ---------------------- Bulk operations ----------------------
+    # Each one is a single O(n) pass that rebuilds the deque once and bumps the
+    # version once, however many songs it touches. The current song (index 0)
+    # is never moved or removed by them.
+
+    def _rebuild(self, upcoming):
+        current = self._songs[0]
+        self._songs = deque(itertools.chain((current,), upcoming))
+        self._durations = DurationIndex(_duration(song) for song in self._songs)
+        self._touch()
+
+    def remove_range(self, start: int, stop: int) -> int:
+        """Remove the songs at positions start..stop (1-based upcoming positions, inclusive). Returns how many."""
+        if len(self._songs) < 2:
+            return 0
+        start, stop = max(start, 1), min(stop, len(self._songs) - 1)
+        if start > stop:
+            return 0
+        self._rebuild(song for index, song in enumerate(self.upcoming(), start=1) if not start <= index <= stop)
+        return stop - start + 1
+
+    def remove_where(self, predicate) -> int:
+        """Remove every upcoming song matching predicate(song). Returns how many."""
+        if len(self._songs) < 2:
+            return 0
+        kept = [song for song in self.upcoming() if not predicate(song)]
+        removed = len(self._songs) - 1 - len(kept)
+        if removed:
+            self._rebuild(kept)
+        return removed
+
+    def shuffle(self):
+        """Shuffle the upcoming songs."""
+        if len(self._songs) < 3:
+            return
+        upcoming = list(self.upcoming())
+        random.shuffle(upcoming)
+        self._rebuild(upcoming)
+
+    def dedupe(self, key) -> int:
+        """Drop upcoming songs whose key(song) was already seen earlier in the queue (the current song included). Returns how many."""
+        seen = set()
+
+        def is_duplicate(song):
+            song_key = key(song)
+            if song_key in seen:
+                return True
+            seen.add(song_key)
+            return False
+
+        if self._songs:
+            seen.add(key(self._songs[0]))
+        return self.remove_where(is_duplicate)
+
+
+class FairMusicQueue:
+    """
+    Fair-queueing alternative to MusicQueue with the same interface.
+
+    Every requester gets their own sub-queue (lane) and the lanes are played
+    round-robin, `weight` songs per turn (default 1), so one user adding 50
+    songs doesn't push everyone else back. qplay songs (push_next) and moved
+    songs go to a priority lane that plays before the rotation.
+
+    Picking the next song is O(1). Positional reads (indexing, upcoming,
+    wait_time) use the interleaved order, materialized in O(n) once per
+    change and cached until the next one.
+    """
+
+    def __init__(self, songs=(), weights: dict | None = None, keep_order: bool = False):
+        """
+        Args:
+            songs: initial songs, the first one is the current song.
+            weights: requester_id -> songs per turn.
+            keep_order: pin `songs` in the priority lane so they play in the given
+                order (switching modes, restoring a saved queue); only songs
+                added later are interleaved.
+        """
+        self.weights = dict(weights or {})  # requester_id -> songs per turn
+        self._current = None
+        self._priority = deque()
+        self._lanes = {}  # requester_id -> deque of songs, never empty
+        self._rotation = deque()  # requester ids with songs, the head plays next
+        self._used = 0  # songs the head of the rotation played in its current turn
+        self._count = 0
+        self._order = None  # (version, [songs in play order], [wait time of each])
+        self.version = next(_versions)
+        for song in songs:
+            if keep_order and self._current is not None:
+                self._priority.append(song)
+                self._count += 1
+            else:
+                self.append(song)
+
+    def _touch(self):
+        self.version = next(_versions)
+
+    def _weight(self, requester_id) -> int:
+        return max(1, self.weights.get(requester_id, 1))
+
+    def set_weight(self, requester_id: int, weight: int):
+        """Let a requester play `weight` songs per turn."""
+        self.weights[requester_id] = max(1, weight)
+        self._touch()
+
+    # ---------------------- Play order ----------------------
+
+    def _take_next(self):
+        if self._priority:
+            return self._priority.popleft()
+        if not self._rotation:
+            return None
+
+        requester_id = self._rotation[0]
+        lane = self._lanes[requester_id]
+        song = lane.popleft()
+        self._used += 1
+        if not lane:
+            del self._lanes[requester_id]
+            self._rotation.popleft()
+            self._used = 0
+        elif self._used >= self._weight(requester_id):
+            self._rotation.rotate(-1)
+            self._used = 0
+        return song
+
+    def _play_order(self) -> tuple[list, list]:
+        """The songs in the order they will play, and the wait before each one."""
+        if self._order is not None and self._order[0] == self.version:
+            return self._order[1], self._order[2]
+
+        order = [] if self._current is None else [self._current]
+        order.extend(self._priority)
+
+        # Same walk as _take_next, on iterators instead of the real lanes
+        lanes = {requester_id: iter(lane) for requester_id, lane in self._lanes.items()}
+        rotation = deque(self._rotation)
+        used = self._used
+        while rotation:
+            requester_id = rotation[0]
+            song = next(lanes[requester_id], None)
+            if song is None:
+                rotation.popleft()
+                used = 0
+                continue
+            order.append(song)
+            used += 1
+            if used >= self._weight(requester_id):
+                rotation.rotate(-1)
+                used = 0
+
+        waits = list(itertools.accumulate((_duration(song) for song in order), initial=0))
+        self._order = (self.version, order, waits)
+        return order, waits
+
+    # ---------------------- MusicQueue interface ----------------------
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return iter(self._play_order()[0])
+
+    def __getitem__(self, index: int):
+        return self._play_order()[0][index]
+
+    @property
+    def current(self):
+        return self._current
+
+    @property
+    def next_song(self):
+        if self._current is None:
+            return None
+        if self._priority:
+            return self._priority[0]
+        if self._rotation:
+            return self._lanes[self._rotation[0]][0]
+        return None
+
+    def upcoming(self, start: int = 0, stop: int | None = None):
+        return islice(self._play_order()[0], start + 1, None if stop is None else stop + 1)
+
+    def index(self, song) -> int:
+        """Position of `song` (by identity) in the play order."""
+        for index, other in enumerate(self._play_order()[0]):
+            if other is song:
+                return index
+        raise ValueError("song is not in the queue")
+
+    def wait_time(self, index: int) -> float:
+        waits = self._play_order()[1]
+        return waits[min(index, len(waits) - 1)]
+
+    @property
+    def total_duration(self) -> float:
+        return self._play_order()[1][-1]
+
+    def append(self, song):
+        """Add a song to the end of its requester's lane; new requesters join the end of the rotation."""
+        self._count += 1
+        self._touch()
+        if self._current is None:
+            self._current = song
+            return
+        requester_id = song.requester_id
+        if requester_id not in self._lanes:
+            self._lanes[requester_id] = deque()
+            self._rotation.append(requester_id)
+        self._lanes[requester_id].append(song)
+
+    def push_next(self, song):
+        """Put a song right after the current one (qplay), ahead of the rotation."""
+        self._count += 1
+        self._touch()
+        if self._current is None:
+            self._current = song
+        else:
+            self._priority.appendleft(song)
+
+    def pop_current(self):
+        if self._current is None:
+            return None
+        song = self._current
+        self._current = self._take_next()
+        self._count -= 1
+        self._touch()
+        return song
+
+    def remove(self, index: int):
+        """Remove and return the song at `index` of the play order (0 is the current song)."""
+        song = self[index]
+        if song is self._current:
+            return self.pop_current()
+        self._filter(lambda other: other is not song)
+        return song
+
+    def move(self, src: int, dst: int):
+        """
+        Move the song at `src` to position `dst`. The song is pinned in the
+        priority lane, so it lands at `dst` or earlier if fewer songs are pinned.
+        """
+        song = self.remove(src)
+        self._priority.insert(max(0, min(dst - 1, len(self._priority))), song)
+        self._count += 1
+        self._touch()
+
+    def clear(self):
+        self._current = None
+        self._priority.clear()
+        self._lanes.clear()
+        self._rotation.clear()
+        self._used = 0
+        self._count = 0
+        self._touch()
+
+    # ---------------------- Bulk operations ----------------------
+
+    def _filter(self, keep) -> int:
+        """Keep only the upcoming songs for which keep(song) is true, in one pass. Returns how many were removed."""
+        head = self._rotation[0] if self._rotation else None
+        self._priority = deque(song for song in self._priority if keep(song))
+        for requester_id in list(self._lanes):
+            lane = deque(song for song in self._lanes[requester_id] if keep(song))
+            if lane:
+                self._lanes[requester_id] = lane
+            else:
+                del self._lanes[requester_id]
+        self._rotation = deque(requester_id for requester_id in self._rotation if requester_id in self._lanes)
+        if not self._rotation or self._rotation[0] != head:
+            self._used = 0
+
+        count = (self._current is not None) + len(self._priority) + sum(len(lane) for lane in self._lanes.values())
+        removed = self._count - count
+        self._count = count
+        self._touch()
+        return removed
+
+    def remove_range(self, start: int, stop: int) -> int:
+        doomed = {id(song) for song in self.upcoming(max(start, 1) - 1, stop)}
+        return self._filter(lambda song: id(song) not in doomed) if doomed else 0
+
+    def remove_where(self, predicate) -> int:
+        return self._filter(lambda song: not predicate(song))
+
+    def shuffle(self):
+        """Shuffle each lane; the rotation (and so the fairness) is kept."""
+        for lane in (self._priority, *self._lanes.values()):
+            random.shuffle(lane)
+        self._touch()
+
+    def dedupe(self, key) -> int:
+        seen, doomed = set(), set()
+        for song in self:
+            song_key = key(song)
+            if song_key in seen:
+                doomed.add(id(song))
+            seen.add(song_key)
+        return self._filter(lambda song: id(song) not in doomed) if doomed else 0
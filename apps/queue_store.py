@@ -0,0 +1,191 @@
+# apps/queue_store.py
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from apps.ffmpeg_setup import music_queue, voice_client_dict
+from apps.queue_engine import FairMusicQueue, MusicQueue
+from apps.track import Track, TrackInfo
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queues (
+    voice_channel_id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    text_channel_id INTEGER,
+    active INTEGER NOT NULL DEFAULT 0,
+    tracks TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    mode TEXT NOT NULL DEFAULT 'fifo',
+    weights TEXT NOT NULL DEFAULT '{}'
+)
+"""
+
+# Columns added after the first release, created on databases that predate them
+MIGRATIONS = {
+    'mode': "ALTER TABLE queues ADD COLUMN mode TEXT NOT NULL DEFAULT 'fifo'",
+    'weights': "ALTER TABLE queues ADD COLUMN weights TEXT NOT NULL DEFAULT '{}'",
+}
+
+
+def serialize_queue(queue) -> str:
+    """Queue entries as JSON: the track metadata plus the requester's id."""
+    return json.dumps(
+        [{**track.info.to_dict(), 'requester_id': track.requester_id} for track in queue],
+        ensure_ascii=False,
+    )
+
+
+def deserialize_queue(payload: str, mode: str = 'fifo', weights: str = '{}') -> MusicQueue | FairMusicQueue:
+    """Rebuild a queue in its saved mode; a fair queue keeps the saved play order."""
+    tracks = []
+    for data in json.loads(payload):
+        requester_id = data.pop('requester_id')
+        tracks.append(Track(TrackInfo.from_dict(data), requester_id))
+    weights = {int(requester_id): weight for requester_id, weight in json.loads(weights).items()}
+    if mode == 'fair':
+        return FairMusicQueue(tracks, weights, keep_order=True)
+    return MusicQueue(tracks, weights)
+
+
+class QueueStore:
+    """
+    Durable copy of every channel's queue in SQLite (WAL mode), so a redeploy
+    or a crash doesn't wipe them.
+
+    Write-behind: the playback path never touches the disk. A background task
+    compares each queue's version with the last saved one every few seconds
+    and writes all changed queues in one transaction on a dedicated thread.
+    """
+
+    def __init__(self, path: str = 'queues.db', flush_delay: float = 3):
+        """
+        Args:
+            path (str): SQLite database file.
+            flush_delay (float): Seconds between write-behind passes, the most
+                queue changes that can be lost on a crash.
+        """
+        self.path = path
+        self.flush_delay = flush_delay
+        # One thread owns every write, so the connection is never used concurrently
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="queue-store")
+        self._conn = self._connect()
+        self._saved = {}  # voice_channel_id -> (queue version, active) last written
+        self._channels = {}  # voice_channel_id -> (guild_id, text_channel_id)
+        self._task = None
+        # Saved queues not restored yet; the tracks are only parsed when restored
+        self.restorable = self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe for the database itself
+        conn.execute(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(queues)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                conn.execute(statement)
+        conn.commit()
+        return conn
+
+    def _load(self) -> dict:
+        rows = self._conn.execute(
+            "SELECT voice_channel_id, guild_id, text_channel_id, active, tracks, mode, weights FROM queues"
+        ).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def track_channel(self, voice_channel, text_channel):
+        """Remember where a queue is played and announced, needed to resume it later."""
+        self._channels[voice_channel.id] = (voice_channel.guild.id, text_channel.id)
+
+    def restore(self, voice_channel_id: int) -> MusicQueue | FairMusicQueue | None:
+        """Take the saved queue of a channel (in its saved mode, with its weights), or None if there is none."""
+        row = self.restorable.pop(voice_channel_id, None)
+        if row is None:
+            return None
+        try:
+            return deserialize_queue(row[3], row[4], row[5]) or None
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Error restoring queue of {voice_channel_id}: {e}")
+            return None
+
+    def active_channels(self) -> list[tuple[int, int | None]]:
+        """(voice_channel_id, text_channel_id) of saved queues whose channel was playing at shutdown."""
+        return [
+            (voice_channel_id, text_channel_id)
+            for voice_channel_id, (_, text_channel_id, active, *_) in self.restorable.items()
+            if active
+        ]
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_delay)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error saving queues: {e}")
+
+    def _collect(self) -> tuple[list, list, dict]:
+        """
+        Snapshot the queues changed since the last pass (on the loop thread, so nothing mutates mid-way).
+
+        Returns:
+            tuple: The rows to upsert, the rows to delete, and the (version, active)
+                states they capture, to be marked saved once the write succeeded.
+        """
+        upserts, deletes, states = [], [], {}
+        now = time.time()
+        for voice_channel_id, queue in list(music_queue.items()):
+            voice_client = voice_client_dict.get(voice_channel_id)
+            active = bool(queue) and voice_client is not None and voice_client.is_connected()
+            state = (queue.version, active)
+            if self._saved.get(voice_channel_id) == state:
+                continue
+
+            if not queue:
+                deletes.append((voice_channel_id,))
+            elif channel := self._channels.get(voice_channel_id):
+                guild_id, text_channel_id = channel
+                mode = 'fair' if isinstance(queue, FairMusicQueue) else 'fifo'
+                upserts.append((
+                    voice_channel_id, guild_id, text_channel_id, int(active), serialize_queue(queue), now,
+                    mode, json.dumps(queue.weights),
+                ))
+            else:
+                continue  # Not played anywhere yet, try again next pass
+            states[voice_channel_id] = state
+        return upserts, deletes, states
+
+    def _write(self, upserts: list, deletes: list):
+        with self._conn:  # One transaction per pass
+            self._conn.executemany(
+                "INSERT INTO queues (voice_channel_id, guild_id, text_channel_id, active, tracks, updated_at, mode, weights) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(voice_channel_id) DO UPDATE SET guild_id=excluded.guild_id, "
+                "text_channel_id=excluded.text_channel_id, active=excluded.active, "
+                "tracks=excluded.tracks, updated_at=excluded.updated_at, "
+                "mode=excluded.mode, weights=excluded.weights",
+                upserts,
+            )
+            self._conn.executemany("DELETE FROM queues WHERE voice_channel_id = ?", deletes)
+
+    async def flush(self):
+        upserts, deletes, states = self._collect()
+        if upserts or deletes:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._write, upserts, deletes)
+        # Only after the transaction committed, a failed write is retried next pass
+        self._saved.update(states)
+
+    async def close(self):
+        """Final write, then release the database."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        self._executor.shutdown(wait=True)
+        self._conn.close()
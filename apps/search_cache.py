@@ -0,0 +1,83 @@
+# apps/search_cache.py
+import time
+from collections import OrderedDict
+
+from utils.json_store import JsonStore
+from utils.query_utils import normalize_query
+
+
+class SearchCache:
+    """
+    LRU + TTL cache of YouTube search results keyed by (max_results, normalized query),
+    optionally persisted to a JSON file so cached results survive restarts.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 6 * 3600, path: str | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, list]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self.store = JsonStore(path) if path else None
+        if self.store is not None:
+            self._load_from_store()
+
+    @staticmethod
+    def make_key(query: str, max_results: int) -> str:
+        return f"{max_results}:{normalize_query(query)}"
+
+    def _load_from_store(self):
+        now = time.time()
+        records = sorted(
+            (record['expires_at'], key, record['entries'])
+            for key, record in self.store.items()
+            if record['expires_at'] > now
+        )
+        # Keep the freshest ones if the file holds more than fits in memory
+        for expires_at, key, entries in records[-self.max_size:]:
+            self._entries[key] = (expires_at, entries)
+        for key in [key for key, _ in self.store.items() if key not in self._entries]:
+            self.store.pop(key)
+
+    def get(self, query: str, max_results: int) -> list | None:
+        key = self.make_key(query, max_results)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return [dict(result) for result in entry[1]]
+
+    def set(self, query: str, max_results: int, entries: list):
+        if not entries:
+            return  # Don't cache failures/empty answers
+        key = self.make_key(query, max_results)
+        expires_at = time.time() + self.ttl
+        entries = [dict(result) for result in entries]  # The caller's list may still change
+        self._entries[key] = (expires_at, entries)
+        self._entries.move_to_end(key)
+        if self.store is not None:
+            self.store.set(key, {'expires_at': expires_at, 'entries': entries})
+
+        while len(self._entries) > self.max_size:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+    def _remove(self, key: str):
+        self._entries.pop(key, None)
+        if self.store is not None:
+            self.store.pop(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,28 @@
+# apps/single_flight.py
+import asyncio
+from typing import Awaitable, Callable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller starts the
+    work, everyone else arriving while it is in flight awaits the same result.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Task] = {}
+        self.coalesced = 0  # callers that piggybacked on an in-flight call
+
+    async def do(self, key: str, func: Callable[[], Awaitable]):
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # Run as its own task so one caller being cancelled doesn't cancel the rest
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
+
+    def __len__(self):
+        return len(self._calls)
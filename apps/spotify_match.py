@@ -0,0 +1,88 @@
+# apps/spotify_match.py
+import re
+from difflib import SequenceMatcher
+
+from utils.json_store import JsonStore
+from utils.query_utils import normalize_query
+
+# Seconds of difference between the Spotify and YouTube durations still considered a perfect match
+DURATION_TOLERANCE = 5
+# Beyond this difference a candidate is rejected outright (other edit, extended intro...)
+DURATION_LIMIT = 30
+MIN_SCORE = 0.45
+
+# Version markers that make a video a different recording unless the Spotify title has them too
+VERSION_MARKERS = (
+    'live', 'cover', 'remix', 'karaoke', 'instrumental', 'acoustic',
+    'sped up', 'slowed', 'nightcore', '8d', 'reverb', 'remake',
+)
+
+
+def score_candidate(track_info: dict, entry: dict) -> float:
+    """
+    Score a YouTube search entry against a Spotify track object (higher is better).
+
+    Combines duration closeness, title similarity and a penalty for version
+    markers (live, cover, remix...) that the Spotify title doesn't have.
+    """
+    spotify_duration = track_info['duration_ms'] / 1000
+    duration_diff = abs((entry.get('duration') or 0) - spotify_duration)
+    if duration_diff > DURATION_LIMIT:
+        return 0.0
+    duration_score = 1.0 if duration_diff <= DURATION_TOLERANCE else 1 - (duration_diff - DURATION_TOLERANCE) / (DURATION_LIMIT - DURATION_TOLERANCE)
+
+    track_name = normalize_query(track_info['name'])
+    artists = normalize_query(' '.join(artist['name'] for artist in track_info['artists']))
+    candidate = normalize_query(f"{entry.get('channel') or ''} {entry['title']}")
+
+    # How much of the track name and artist appear in the video title/channel
+    name_words = set(track_name.split())
+    artist_words = set(artists.split())
+    candidate_words = set(candidate.split())
+    name_coverage = len(name_words & candidate_words) / len(name_words) if name_words else 0
+    artist_coverage = len(artist_words & candidate_words) / len(artist_words) if artist_words else 0
+    similarity = SequenceMatcher(None, f"{artists} {track_name}", candidate).ratio()
+    title_score = 0.5 * name_coverage + 0.3 * artist_coverage + 0.2 * similarity
+
+    penalty = 0.0
+    for marker in VERSION_MARKERS:
+        pattern = rf'\b{marker}\b'
+        if re.search(pattern, candidate) and not re.search(pattern, track_name):
+            penalty += 0.25
+
+    # "Artist - Topic" channels carry the official audio of the exact recording
+    bonus = 0.1 if (entry.get('channel') or '').endswith(' - Topic') else 0.0
+
+    return round(0.45 * duration_score + 0.55 * title_score + bonus - min(penalty, 0.5), 3)
+
+
+def pick_best_match(track_info: dict, entries: list[dict]) -> dict | None:
+    """Return the best scoring entry, or None if nothing is a convincing match."""
+    if not entries:
+        return None
+    scored = [(score_candidate(track_info, entry), index, entry) for index, entry in enumerate(entries)]
+    # On equal scores prefer the earlier search result
+    score, _, entry = max(scored, key=lambda item: (item[0], -item[1]))
+    return entry if score >= MIN_SCORE else None
+
+
+class SpotifyMatchCache:
+    """
+    Persistent Spotify track -> YouTube entry mapping, also indexed by ISRC so
+    the same recording released under several Spotify ids shares one match.
+    """
+
+    def __init__(self, path: str = 'spotify_matches.json'):
+        self.store = JsonStore(path)
+
+    def get(self, track_id: str | None = None, isrc: str | None = None) -> dict | None:
+        for key in (f"track:{track_id}" if track_id else None, f"isrc:{isrc}" if isrc else None):
+            if key and (entry := self.store.get(key)):
+                return dict(entry)
+        return None
+
+    def set(self, track_info: dict, entry: dict):
+        entry = {key: entry.get(key) for key in ('id', 'url', 'title', 'duration', 'thumbnail', 'channel')}
+        self.store.set(f"track:{track_info['id']}", entry)
+        if isrc := track_info.get('external_ids', {}).get('isrc'):
+            self.store.set(f"isrc:{isrc}", entry)
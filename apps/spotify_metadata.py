@@ -0,0 +1,171 @@
+# apps/spotify_metadata.py
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+
+import spotipy
+from spotipy.exceptions import SpotifyException
+from spotipy.oauth2 import SpotifyClientCredentials
+
+# Most ids the multi-track endpoint (GET /tracks?ids=...) accepts per call
+TRACKS_BATCH_SIZE = 50
+
+
+class SpotifyMetadata:
+    """
+    Async layer over spotipy.
+
+    - the blocking spotipy calls run in the default executor, never on the event loop
+    - concurrent track() lookups are collected for a few milliseconds and sent as one
+      multi-track request
+    - track objects are cached with a TTL
+    - 429 responses pause all calls for the Retry-After the API asks for
+    """
+
+    def __init__(self, client_id: str, client_secret: str, cache_ttl: float = 24 * 3600,
+                 cache_size: int = 4096, batch_window: float = 0.05, max_retries: int = 3):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self._client = None
+        self._cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._batch: dict[str, asyncio.Future] = {}
+        self._batch_task = None
+        self._blocked_until = 0.0
+
+    @property
+    def client(self) -> spotipy.Spotify:
+        # Built on first use instead of when the cog loads
+        if self._client is None:
+            self._client = spotipy.Spotify(
+                auth_manager=SpotifyClientCredentials(
+                    client_id=self.client_id,
+                    client_secret=self.client_secret
+                ),
+                requests_timeout=10,
+                # Rate limits are handled here (without blocking an executor thread on sleeps)
+                retries=0,
+                status_retries=0,
+                # Without 429 here urllib3 returns the response instead of raising MaxRetryError,
+                # so the SpotifyException carries its headers (and Retry-After) to _call
+                status_forcelist=(500, 502, 503, 504),
+            )
+        return self._client
+
+    async def _call(self, method: str, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            if (wait := self._blocked_until - time.monotonic()) > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await loop.run_in_executor(
+                    None, functools.partial(getattr(self.client, method), *args, **kwargs)
+                )
+            except SpotifyException as e:
+                if e.http_status != 429 or attempt == self.max_retries:
+                    raise
+                try:
+                    retry_after = float((e.headers or {}).get('Retry-After', 1))
+                except ValueError:
+                    retry_after = 1.0  # Not in seconds (an HTTP date), don't guess
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                print(f"Spotify rate limited, retrying in {retry_after}s")
+
+    # ---------------------- Tracks ----------------------
+
+    def _cache_get(self, track_id: str) -> dict | None:
+        entry = self._cache.get(track_id)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        self._cache.move_to_end(track_id)
+        return entry[1]
+
+    def _cache_set(self, track: dict):
+        self._cache[track['id']] = (time.monotonic() + self.cache_ttl, track)
+        self._cache.move_to_end(track['id'])
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def track(self, track_id: str) -> dict:
+        """Return a full track object, batched with other lookups made at the same time."""
+        if cached := self._cache_get(track_id):
+            return cached
+
+        # Bound before a possible flush, which starts a new batch dict
+        future = self._batch.get(track_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._batch[track_id] = loop.create_future()
+            if len(self._batch) >= TRACKS_BATCH_SIZE:
+                self._send_batch()
+            elif self._batch_task is None:
+                self._batch_task = loop.call_later(self.batch_window, self._send_batch)
+        return await asyncio.shield(future)
+
+    async def tracks(self, track_ids: list[str]) -> list[dict]:
+        """Return full track objects for many ids (missing ones are dropped)."""
+        results = await asyncio.gather(*(self.track(track_id) for track_id in track_ids), return_exceptions=True)
+        return [track for track in results if isinstance(track, dict)]
+
+    def _send_batch(self):
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+            self._batch_task = None
+        batch, self._batch = self._batch, {}
+        if batch:
+            asyncio.get_running_loop().create_task(self._fetch_batch(batch))
+
+    async def _fetch_batch(self, batch: dict[str, asyncio.Future]):
+        try:
+            response = await self._call('tracks', list(batch))
+            found = {track['id']: track for track in response['tracks'] if track}
+            for track_id, future in batch.items():
+                if future.done():
+                    continue
+                if track := found.get(track_id):
+                    self._cache_set(track)
+                    future.set_result(track)
+                else:
+                    future.set_exception(ValueError(f"Spotify track not found: {track_id}"))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    # ---------------------- Collections ----------------------
+
+    async def iter_collection(self, kind: str, collection_id: str, max_tracks: int = 500):
+        """
+        Async generator paging through a Spotify album/playlist.
+
+        Yields:
+            tuple[str, list[dict]]: (collection name, full track objects of the page)
+        """
+        if kind == 'album':
+            album = await self._call('album', collection_id)
+            name, page = album['name'], album['tracks']  # the album object carries the first page
+        else:
+            name = (await self._call('playlist', collection_id, fields='name'))['name']
+            page = await self._call('playlist_items', collection_id, limit=100, additional_types=('track',))
+
+        listed = 0
+        while True:
+            if kind == 'album':
+                # Album pages only hold simplified tracks, the full ones come from the batched lookup
+                tracks = await self.tracks([item['id'] for item in page['items'] if item.get('id')])
+            else:
+                tracks = [item['track'] for item in page['items'] if item.get('track') and item['track'].get('id')]
+                for track in tracks:
+                    self._cache_set(track)
+
+            tracks = tracks[:max_tracks - listed]
+            listed += len(tracks)
+            yield name, tracks
+
+            if not page.get('next') or listed >= max_tracks:
+                return
+            page = await self._call('next', page)
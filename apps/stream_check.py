@@ -0,0 +1,48 @@
+# apps/stream_check.py
+import asyncio
+import time
+
+import aiohttp
+
+from apps.http_session import get_session
+from apps.track import TrackInfo
+
+# Small ranged read: enough to warm DNS/TLS and the CDN edge for the stream,
+# cheap enough to run before every track
+PROBE_RANGE = 'bytes=0-65535'
+
+
+async def probe_stream(url: str, timeout: float = 5) -> int | None:
+    """
+    Issue a small ranged GET against a stream url.
+
+    Returns:
+        int | None: The HTTP status, or None if the request itself failed.
+    """
+    try:
+        async with get_session().get(
+            url,
+            headers={'Range': PROBE_RANGE},
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            await response.content.read(65536)
+            return response.status
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Stream probe failed: {e}")
+        return None
+
+
+def is_stream_rejected(status: int | None) -> bool:
+    """True when the CDN refused the url (expired or invalid signature)."""
+    return status in (403, 404, 410)
+
+
+def is_stream_expiring(track_info: TrackInfo, margin: float = 60) -> bool:
+    """
+    True when the song has no stream url yet, or its signed url expires
+    within `margin` seconds. Entries without a known expiry are trusted.
+    """
+    if not track_info.url:
+        return True
+    expires_at = track_info.expires_at
+    return expires_at is not None and expires_at - time.time() < margin
@@ -0,0 +1,118 @@
+# apps/track.py
+import sys
+import weakref
+
+# The only TrackInfo attributes that change after creation: the resolved stream
+_STREAM_FIELDS = frozenset({'url', 'expires_at', 'acodec', 'prefetched_at'})
+
+# video id (or page url) -> TrackInfo, shared by every queue entry of that video
+_interned: 'weakref.WeakValueDictionary[str, TrackInfo]' = weakref.WeakValueDictionary()
+
+
+class TrackInfo:
+    """
+    Metadata of one video, interned by video id: the same song queued in 50
+    guilds is stored once. The metadata is read-only; the resolved stream url
+    (and its expiry/codec) is the one mutable part, refreshed in place so every
+    queue holding the video benefits from one re-resolve.
+    """
+
+    __slots__ = ('id', 'title', 'webpage_url', 'duration', 'thumbnail',
+                 'url', 'expires_at', 'acodec', 'prefetched_at', '__weakref__')
+
+    def __init__(self, id: str | None, title: str, webpage_url: str | None, duration: float,
+                 thumbnail: str | None, url: str | None = None, expires_at: float | None = None,
+                 acodec: str | None = None):
+        self.id = id
+        self.title = sys.intern(title or 'Unknown Title')
+        self.webpage_url = webpage_url
+        self.duration = duration or 0
+        self.thumbnail = thumbnail
+        self.url = url
+        self.expires_at = expires_at
+        self.acodec = acodec
+        self.prefetched_at = 0.0
+
+    def __setattr__(self, name, value):
+        if name not in _STREAM_FIELDS and hasattr(self, name):
+            raise AttributeError(f"TrackInfo.{name} is read-only")
+        object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        return f"<TrackInfo id={self.id!r} title={self.title!r}>"
+
+    @classmethod
+    def intern(cls, id: str | None, title: str, webpage_url: str | None, duration: float,
+               thumbnail: str | None, url: str | None = None, expires_at: float | None = None,
+               acodec: str | None = None) -> 'TrackInfo':
+        """
+        Return the shared TrackInfo for a video, creating it if needed. A newer
+        stream url (one that expires later) replaces the stored one.
+        """
+        key = id or webpage_url
+        info = _interned.get(key) if key else None
+        if info is None:
+            info = cls(id, title, webpage_url, duration, thumbnail, url, expires_at, acodec)
+            if key:
+                _interned[key] = info
+        elif url and (info.url is None or (expires_at or 0) > (info.expires_at or 0)):
+            info.set_stream(url, expires_at, acodec)
+        return info
+
+    def set_stream(self, url: str | None, expires_at: float | None, acodec: str | None = None):
+        self.url = url
+        self.expires_at = expires_at
+        self.acodec = acodec
+        self.prefetched_at = 0.0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__ if name not in ('prefetched_at', '__weakref__')}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TrackInfo':
+        return cls.intern(**data)
+
+
+class Track:
+    """
+    A queue entry: the shared TrackInfo plus who requested it. Immutable, and
+    only the requester's id is kept (not the discord.Member) so queued songs
+    don't keep stale member state alive.
+    """
+
+    __slots__ = ('info', 'requester_id')
+
+    def __init__(self, info: TrackInfo, requester_id: int):
+        object.__setattr__(self, 'info', info)
+        object.__setattr__(self, 'requester_id', requester_id)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Track is immutable")
+
+    def __repr__(self):
+        return f"<Track {self.info.title!r} requested by {self.requester_id}>"
+
+    # Read-through shortcuts to the shared metadata
+    @property
+    def id(self):
+        return self.info.id
+
+    @property
+    def title(self):
+        return self.info.title
+
+    @property
+    def webpage_url(self):
+        return self.info.webpage_url
+
+    @property
+    def duration(self):
+        return self.info.duration
+
+    @property
+    def thumbnail(self):
+        return self.info.thumbnail
+
+    @property
+    def url(self):
+        return self.info.url
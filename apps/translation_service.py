@@ -0,0 +1,87 @@
+# apps/translation_service.py
+import asyncio
+import hashlib
+from collections import OrderedDict
+
+from googletrans import Translator
+
+from apps.single_flight import SingleFlight
+
+# Google Translate rejects requests around 5000 characters
+MAX_CHUNK_CHARS = 4500
+
+
+def chunk_lines(lines: list[str], max_chars: int = MAX_CHUNK_CHARS) -> list[str]:
+    """Pack whole lines into as few newline-joined chunks as possible."""
+    chunks, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) + 1 > max_chars:
+            chunks.append('\n'.join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append('\n'.join(current))
+    return chunks
+
+
+def is_latin_script(text: str) -> bool:
+    """True when the text has nothing beyond the Latin (extended) blocks, so there's nothing to romanize."""
+    return all(ord(char) <= 0x24F or not char.isalpha() for char in text)
+
+
+class TranslationService:
+    """
+    One shared googletrans client for the whole bot.
+
+    Lyrics are sent in as few requests as possible (lines batched into large
+    chunks, chunks sent concurrently), results are cached by lyrics hash and
+    target script, and the calls never run on the event loop.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._translator = None
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._inflight = SingleFlight()
+
+    @property
+    def translator(self) -> Translator:
+        if self._translator is None:
+            self._translator = Translator()
+        return self._translator
+
+    async def _translate(self, text: str, **kwargs):
+        # googletrans 4.0.1+ is async, older releases block on HTTP
+        if asyncio.iscoroutinefunction(self.translator.translate):
+            return await self.translator.translate(text, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.translator.translate(text, **kwargs))
+
+    async def romanize(self, lyrics: str) -> str:
+        """Return the lyrics transliterated to the Latin script, line by line."""
+        if is_latin_script(lyrics):
+            return lyrics
+
+        key = f"{hashlib.sha1(lyrics.encode()).hexdigest()}:latin"
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        romanized = await self._inflight.do(key, lambda: self._romanize(lyrics))
+        self._cache[key] = romanized
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return romanized
+
+    async def _romanize(self, lyrics: str) -> str:
+        chunks = chunk_lines(lyrics.split('\n'))
+        results = await asyncio.gather(*(self._translate(chunk, dest='en') for chunk in chunks))
+
+        romanized = []
+        for chunk, result in zip(chunks, results):
+            # The source-side transliteration is what we want; fall back to the original text
+            extra_data = getattr(result, 'extra_data', None) or {}
+            pronunciation = extra_data.get('origin_pronunciation')
+            romanized.append(pronunciation if isinstance(pronunciation, str) and pronunciation.strip() else chunk)
+        return '\n'.join(romanized)
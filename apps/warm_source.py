@@ -0,0 +1,50 @@
+# apps/warm_source.py
+import time
+from collections import deque
+
+import discord
+
+# 20ms per Opus packet: a few are enough to know FFmpeg is up and producing audio
+WARM_PACKETS = 3
+
+
+class WarmOpusSource(discord.AudioSource):
+    """
+    Wraps an Opus AudioSource (FFmpegOpusAudio) and reads its first packets
+    ahead of time, so the voice client starts on audio that is already there
+    instead of waiting for FFmpeg to connect, probe and encode.
+    """
+
+    def __init__(self, source: discord.AudioSource):
+        self.source = source
+        self._buffer = deque()
+        self._spawned_at = time.perf_counter()
+        self.first_packet_after = None  # Seconds from spawning FFmpeg to its first packet
+
+    def warm(self, packets: int = WARM_PACKETS) -> bool:
+        """
+        Read the first packets into the buffer. Blocking, run it in an executor.
+
+        Returns:
+            bool: False if FFmpeg ended without producing any audio.
+        """
+        while len(self._buffer) < packets:
+            data = self.source.read()
+            if not data:
+                break
+            if self.first_packet_after is None:
+                self.first_packet_after = time.perf_counter() - self._spawned_at
+            self._buffer.append(data)
+        return bool(self._buffer)
+
+    def read(self) -> bytes:
+        if self._buffer:
+            return self._buffer.popleft()
+        return self.source.read()
+
+    def is_opus(self) -> bool:
+        return self.source.is_opus()
+
+    def cleanup(self):
+        self._buffer.clear()
+        self.source.cleanup()
@@ -0,0 +1,106 @@
+# apps/youtube_search.py
+from collections import OrderedDict
+
+import aiohttp
+import isodate
+
+from apps.http_session import get_session
+
+YOUTUBE_API_URL = 'https://www.googleapis.com/youtube/v3'
+
+
+class YouTubeSearchError(Exception):
+    """Raised when the YouTube Data API answers with an error status."""
+
+
+class YouTubeSearchClient:
+    """
+    Long-lived, non-blocking YouTube Data API client.
+
+    Requests go through the shared aiohttp session (pooled connections) instead
+    of a googleapiclient discovery client rebuilt on every search. Responses are
+    revalidated with ETags, and video durations are remembered so the
+    videos.list details lookup only asks for ids it hasn't seen yet.
+    """
+
+    def __init__(self, api_key: str, max_cached: int = 1024):
+        self.api_key = api_key
+        self.max_cached = max_cached
+        self._etags: OrderedDict[str, tuple[str, dict]] = OrderedDict()  # request -> (etag, body)
+        self._durations: OrderedDict[str, float] = OrderedDict()  # video_id -> seconds
+
+    async def _get(self, endpoint: str, params: dict) -> dict:
+        request_key = f"{endpoint}?{sorted(params.items())}"
+        headers = {}
+        if cached := self._etags.get(request_key):
+            headers['If-None-Match'] = cached[0]
+
+        async with get_session().get(
+            f"{YOUTUBE_API_URL}/{endpoint}",
+            params={**params, 'key': self.api_key},
+            headers=headers,
+        ) as response:
+            if response.status == 304 and cached:
+                self._etags.move_to_end(request_key)
+                return cached[1]
+            if response.status >= 400:
+                raise YouTubeSearchError(f"{endpoint} returned {response.status}: {await response.text()}")
+            body = await response.json()
+
+        if etag := response.headers.get('ETag') or body.get('etag'):
+            self._etags[request_key] = (etag, body)
+            self._etags.move_to_end(request_key)
+            while len(self._etags) > self.max_cached:
+                self._etags.popitem(last=False)
+        return body
+
+    async def search(self, query: str, max_results: int = 5) -> list[dict]:
+        """
+        Search videos and return entries with title, id, url, duration, thumbnail and channel.
+
+        Raises:
+            YouTubeSearchError, aiohttp.ClientError
+        """
+        response = await self._get('search', {
+            'q': query,
+            'part': 'id,snippet',
+            'maxResults': max_results,
+            'type': 'video',
+            'videoEmbeddable': 'true',  # Filters out non-embeddable videos
+        })
+
+        entries = []
+        for item in response.get('items', []):
+            video_id = item['id']['videoId']
+            snippet = item['snippet']
+            thumbnails = snippet.get('thumbnails', {})
+            thumbnail = (thumbnails.get('high') or thumbnails.get('default') or {}).get('url')
+            entries.append({
+                'title': snippet['title'],
+                'id': video_id,
+                'url': f'https://www.youtube.com/watch?v={video_id}',
+                'duration': None,
+                'thumbnail': thumbnail,
+                'channel': snippet.get('channelTitle'),
+            })
+
+        # Durations only come from videos.list, and only ask for the ones we don't know yet
+        missing = [entry['id'] for entry in entries if entry['id'] not in self._durations]
+        if missing:
+            await self._fetch_durations(missing)
+
+        for entry in entries:
+            entry['duration'] = self._durations.get(entry['id'], 0)
+        return entries
+
+    async def _fetch_durations(self, video_ids: list[str]):
+        response = await self._get('videos', {
+            'part': 'contentDetails',
+            'id': ','.join(video_ids),
+        })
+        for item in response.get('items', []):
+            duration_iso = item['contentDetails']['duration']
+            self._durations[item['id']] = isodate.parse_duration(duration_iso).total_seconds()
+            self._durations.move_to_end(item['id'])
+        while len(self._durations) > self.max_cached * 4:
+            self._durations.popitem(last=False)
@@ -1,5 +1,6 @@
 from discord.ext import commands
 from utils.prefix_utils import save_prefixes
+from apps.ffmpeg_setup import extract_pool, players
 
 class AdminCog(commands.Cog):
     def __init__(self, bot):
@@ -17,4 +18,55 @@ class AdminCog(commands.Cog):
         # Save to JSON
         save_prefixes(self.bot.prefixes_dict)
 
-        await ctx.reply(f"Prefix changed from `{old_prefix}` to `{new_prefix}` for this server.", mention_author=False)
\ No newline at end of file
+        await ctx.reply(f"Prefix changed from `{old_prefix}` to `{new_prefix}` for this server.", mention_author=False)
+
+    @commands.command(name='poolstats', help="Show the yt-dlp extraction pool load. (Admin only)")
+    @commands.has_permissions(administrator=True)
+    async def pool_stats(self, ctx):
+        stats = extract_pool.stats()
+        await ctx.reply(
+            f"Extraction pool (`{stats['mode']}`, {stats['workers']} workers)\n"
+            f"• Running: {stats['running']}\n"
+            f"• Queue depth: {stats['queue_depth']}\n"
+            f"• Avg latency: {stats['avg_latency']:.2f}s • p95: {stats['p95_latency']:.2f}s",
+            mention_author=False
+        )
+
+    @commands.command(name='cachestats', help="Show extraction/search cache hit rates. (Admin only)")
+    @commands.has_permissions(administrator=True)
+    async def cache_stats(self, ctx):
+        music_cog = self.bot.get_cog('MusicCog')
+        if not music_cog:
+            return await ctx.reply("MusicCog is not loaded.", mention_author=False)
+
+        search = music_cog.search_cache.stats()
+        extract = music_cog.extract_cache
+        await ctx.reply(
+            f"Search cache: {search['size']} queries • {search['hits']} hits / {search['misses']} misses "
+            f"({search['hit_rate']:.0%})\n"
+            f"Extraction cache: {len(extract)} songs • {extract.hits} hits / {extract.misses} misses",
+            mention_author=False
+        )
+
+    @commands.command(name='playerstats', help="Show playback actors, song transition times and time to first packet. (Admin only)")
+    @commands.has_permissions(administrator=True)
+    async def player_stats(self, ctx):
+        active = [player for player in players.values() if not player.finished]
+        states = {}
+        for player in active:
+            states[player.state.value] = states.get(player.state.value, 0) + 1
+        times = sorted(t for player in active for t in player.transition_times)
+
+        summary = ", ".join(f"{count} {state}" for state, count in states.items()) or "none"
+        if times:
+            avg = sum(times) / len(times)
+            p95 = times[max(0, int(len(times) * 0.95) - 1)]
+            timing = f"• Transitions: {len(times)} • avg {avg * 1000:.0f}ms • p95 {p95 * 1000:.0f}ms"
+        else:
+            timing = "• Transitions: none yet"
+        music_cog = self.bot.get_cog('MusicCog')
+        if music_cog and (handoffs := sorted(music_cog.handoff_times)):
+            avg = sum(handoffs) / len(handoffs)
+            p95 = handoffs[max(0, int(len(handoffs) * 0.95) - 1)]
+            timing += f"\n• Handoff to voice: avg {avg * 1000:.0f}ms • p95 {p95 * 1000:.0f}ms"
+        await ctx.reply(f"Players: {len(active)} ({summary})\n{timing}", mention_author=False)
@@ -2,20 +2,34 @@ from typing import Final
 import discord
 from discord.ext import commands
 import asyncio
-from googletrans import Translator
-import lyricsgenius
 import yt_dlp
 from yt_dlp.utils import DownloadError
-from apps.ffmpeg_setup import voice_client_dict, ytdl, ffmpeg_options, music_queue, timeout_timers
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import isodate
+from apps.ffmpeg_setup import voice_client_dict, extract_pool, build_ffmpeg_options, music_queue, timeout_timers, prefetch_tasks, ingest_tasks, players, warm_sources
+from apps.queue_engine import MusicQueue, FairMusicQueue
+from apps.queue_store import QueueStore
+from apps.player import GuildPlayer, PlayerCommand, PlayerState
+from apps.extract_cache import ExtractCache, get_cache_key, get_stream_expiry
+from apps.http_session import close_session
+from apps.single_flight import SingleFlight
+from apps.loudness import LoudnessAnalyzer
+from apps.audio_cache import AudioCache, CachedOpusAudio
+from apps.warm_source import WarmOpusSource
+from apps.youtube_search import YouTubeSearchClient, YouTubeSearchError
+from apps.search_cache import SearchCache
+from apps.spotify_match import SpotifyMatchCache, pick_best_match
+from apps.spotify_metadata import SpotifyMetadata
+from apps.lyrics_service import LyricsService
+from apps.translation_service import TranslationService
+from apps.playlist import is_playlist_url, iter_playlist_pages, parse_spotify_url, search_entry_to_track_info
+from apps.track import Track, TrackInfo
+from apps.stream_check import probe_stream, is_stream_rejected, is_stream_expiring
+import aiohttp
 import os
+import time
+from collections import deque
 
 from discord.ui import View, Button
 from discord import ButtonStyle, Message
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
 
 class MusicControlView(View):
     def __init__(self, voice_channel_id: int, music_cog: commands.Cog):
@@ -115,18 +129,66 @@ class MusicControlView(View):
         # Call the show_queue method from MusicCog
         await self.music_cog._show_queue(interaction)
 
+class QueueView(View):
+    """
+    Prev/next buttons for the paginated queue embed.
+    Only the user who opened the queue can turn its pages.
+    """
+
+    def __init__(self, requester_id: int, voice_channel_id: int, music_cog: commands.Cog, page: int = 0, *, timeout=180):
+        super().__init__(timeout=timeout)
+        self.requester_id = requester_id
+        self.voice_channel_id = voice_channel_id
+        self.music_cog = music_cog
+        self.page = page
+
+    async def is_authorized(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.requester_id:
+            await interaction.response.send_message(
+                "You didn't open this queue, use the queue command to get your own!",
+                ephemeral=True
+            )
+            return False
+        return True
+
+    def update_buttons(self, page_count: int):
+        self.prev_button.disabled = self.page <= 0
+        self.next_button.disabled = self.page >= page_count - 1
+
+    async def turn_page(self, interaction: discord.Interaction, step: int):
+        if not await self.is_authorized(interaction):
+            return
+
+        embed, self.page, page_count = self.music_cog._build_queue_embed(
+            interaction.guild, self.voice_channel_id, self.page + step
+        )
+        self.update_buttons(page_count)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Prev", style=ButtonStyle.grey, emoji="⬅️")
+    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Show the previous page of the queue."""
+        await self.turn_page(interaction, -1)
+
+    @discord.ui.button(label="Next", style=ButtonStyle.grey, emoji="➡️")
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Show the next page of the queue."""
+        await self.turn_page(interaction, 1)
+
 class LyricsControlView(View):
     """
     A view containing buttons to control a lyrics embed.
     Ensures only the user who invoked the lyrics command can use these buttons.
     """
 
-    def __init__(self, requester_id: int, lyrics_message:discord.Message, lyrics_embed:discord.Embed, *, timeout=None):
+    def __init__(self, requester_id: int, lyrics_message:discord.Message, lyrics_embed:discord.Embed, translation_service: TranslationService, *, timeout=None):
         super().__init__(timeout=timeout)
         self.requester_id = requester_id
         self.lyrics_message = lyrics_message
         self.lyrics_embed = lyrics_embed
-        self.translator = Translator()
+        self.original_lyrics = lyrics_embed.description
+        self.translation_service = translation_service  # Shared by every lyrics message
+        self.romanized = False
         # self.current_page = 0
         # self.total_pages = total_pages
         # self.lyrics_chunks = list_of_lyrics_pages
@@ -144,13 +206,29 @@ class LyricsControlView(View):
     # 🈳
     @discord.ui.button(label="Romanized", style=ButtonStyle.grey, emoji="🔡")
     async def romanize_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Toggle between the original and the romanized lyrics."""
         if not await self.is_authorized(interaction):
             return
         
-        # TODO: DEVELOP
-        await interaction.response.send_message(
-            f"feature is on development and isnt available right now 🙇‍♂️", ephemeral=True
-        )
+        await interaction.response.defer()
+        if self.romanized:
+            self.lyrics_embed.description = self.original_lyrics
+            button.label = "Romanized"
+            button.style = ButtonStyle.grey
+        else:
+            try:
+                romanized = await self.translation_service.romanize(self.original_lyrics)
+            except Exception as e:
+                print(f"Error romanizing lyrics: {e}")
+                return await interaction.followup.send(
+                    "Couldn't romanize these lyrics right now 🙇‍♂️", ephemeral=True
+                )
+            self.lyrics_embed.description = romanized[:4096]
+            button.label = "Original"
+            button.style = ButtonStyle.success
+
+        self.romanized = not self.romanized
+        await interaction.edit_original_response(embed=self.lyrics_embed, view=self)
 
     @discord.ui.button(label="Close", style=ButtonStyle.red, emoji="❌")
     async def close_button(self, interaction: discord.Interaction, button: Button):
@@ -182,23 +260,134 @@ class MusicCog(commands.Cog):
         # --- Spotify Setup ---
         self.SPOTIFY_CLIEND_ID: Final[str] = os.getenv("SPOTIFY_CLIENT_ID")
         self.SPOTIFY_CLIENT_SECRET: Final[str] = os.getenv("SPOTIFY_CLIENT_SECRET")
-        self.spotify = spotipy.Spotify(
-            auth_manager=SpotifyClientCredentials(
-                client_id=self.SPOTIFY_CLIEND_ID,
-                client_secret=self.SPOTIFY_CLIENT_SECRET
-            )
+        # Async, batched and cached; the spotipy client itself is built on first use
+        self.spotify = SpotifyMetadata(
+            client_id=self.SPOTIFY_CLIEND_ID,
+            client_secret=self.SPOTIFY_CLIENT_SECRET
         )
+        # Persistent Spotify track -> YouTube video matches
+        self.spotify_matches = SpotifyMatchCache(os.getenv('SPOTIFY_MATCH_FILE', 'spotify_matches.json'))
         # --- end of Spotify Setup ---
         
         # --- Genius Setup ---
         self.GENIUS_ACCESS_TOKEN: Final[str] = os.getenv('GENIUS_ACCESS_TOKEN')
-        self.genius = lyricsgenius.Genius(self.GENIUS_ACCESS_TOKEN)
+        self.lyrics = LyricsService(
+            self.GENIUS_ACCESS_TOKEN,
+            path=os.getenv('LYRICS_CACHE_FILE', 'lyrics_cache.json')
+        )
+        # One translator for every lyrics message (romanization)
+        self.translation = TranslationService()
+
+        # --- yt-dlp extraction cache (shared across guilds) ---
+        self.extract_cache = ExtractCache(
+            max_size=int(os.getenv('EXTRACT_CACHE_SIZE', 512))
+        )
+        # Background loudness measurements, used instead of live loudnorm when available
+        self.loudness = LoudnessAnalyzer(os.getenv('LOUDNESS_CACHE_FILE', 'loudness.json'))
+
+        # Optional on-disk cache of pre-encoded Opus audio for hot tracks (off unless AUDIO_CACHE_DIR is set)
+        self.audio_cache = None
+        if audio_cache_dir := os.getenv('AUDIO_CACHE_DIR'):
+            self.audio_cache = AudioCache(
+                audio_cache_dir,
+                max_bytes=int(os.getenv('AUDIO_CACHE_MAX_MB', 1024)) * 1024 * 1024,
+                min_plays=int(os.getenv('AUDIO_CACHE_MIN_PLAYS', 3)),
+            )
+
+        # Identical extractions/searches running at the same time share one call
+        self.inflight = SingleFlight()
+
+        # Upper bound on how many songs a single playlist link may queue
+        self.PLAYLIST_MAX_TRACKS: Final[int] = int(os.getenv('PLAYLIST_MAX_TRACKS', 500))
+
+        # How many Spotify tracks are matched against YouTube at the same time
+        self.SPOTIFY_MATCH_CONCURRENCY: Final[int] = int(os.getenv('SPOTIFY_MATCH_CONCURRENCY', 4))
+
+        # Seconds before the current track ends at which the next one is prefetched
+        self.PREFETCH_LEAD: Final[int] = int(os.getenv('PREFETCH_LEAD', 15))
+        # Stream urls expiring within this many seconds are re-resolved before playing
+        self.STREAM_EXPIRY_MARGIN: Final[int] = int(os.getenv('STREAM_EXPIRY_MARGIN', 120))
+
+        # Upcoming songs per queue page, and the rendered pages per voice channel: {id: (queue version, {page: text})}
+        self.QUEUE_PAGE_SIZE: Final[int] = 5
+        self.queue_pages = {}
+        # When the current song of each channel started (shifted forward by pauses), used for wait times
+        self.playback_started = {}
+        self.paused_at = {}
+        # Seconds from a song's turn to its audio being ready and handed to voice_client.play()
+        self.handoff_times = deque(maxlen=200)
+
+        # New queues interleave requesters round-robin when QUEUE_MODE=fair (toggle per channel with `fairqueue`)
+        self.FAIR_QUEUE_DEFAULT: Final[bool] = os.getenv('QUEUE_MODE', 'fifo').lower() == 'fair'
+
+        # Queues survive restarts: saved in the background, restored on first use
+        self.queue_store = QueueStore(os.getenv('QUEUE_DB_FILE', 'queues.db'))
 
         if not self.YOUTUBE_API_KEY:
             print("YOUTUBE_API_KEY is not set. Please set the environment variable.")
             # Alternatively, you can raise an exception
             raise ValueError("YOUTUBE_API_KEY environment variable not set.")
 
+        # Built once and reused for every search
+        self.youtube_search = YouTubeSearchClient(self.YOUTUBE_API_KEY)
+        # Repeated queries are answered from here instead of spending ~101 quota units each
+        self.search_cache = SearchCache(
+            max_size=int(os.getenv('SEARCH_CACHE_SIZE', 1024)),
+            ttl=float(os.getenv('SEARCH_CACHE_TTL_HOURS', 6)) * 3600,
+            path=os.getenv('SEARCH_CACHE_FILE'),  # optional persistence
+        )
+
+    async def cog_load(self):
+        self.queue_store.start()
+
+    async def cog_unload(self):
+        for task in [*prefetch_tasks.values(), *ingest_tasks.values()]:
+            task.cancel()
+        for player in players.values():
+            player.cancel()
+        players.clear()
+        for voice_channel_id in list(warm_sources):
+            self.discard_warm_source(voice_channel_id)
+        prefetch_tasks.clear()
+        ingest_tasks.clear()
+        self.loudness.store.flush()
+        self.spotify_matches.store.flush()
+        self.lyrics.store.flush()
+        if self.search_cache.store is not None:
+            self.search_cache.store.flush()
+        await self.queue_store.close()
+        await close_session()
+        extract_pool.shutdown()  # Spawned process workers would otherwise outlive a reload
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await self.rejoin_active_channels()
+
+    async def rejoin_active_channels(self):
+        """Reconnect to the voice channels that were playing before a restart and resume their queues."""
+        for voice_channel_id, text_channel_id in self.queue_store.active_channels():
+            voice_channel = self.bot.get_channel(voice_channel_id)
+            text_channel = self.bot.get_channel(text_channel_id) if text_channel_id else None
+            if voice_channel is None or text_channel is None or voice_channel_id in music_queue:
+                continue
+            if not (queue := self.queue_store.restore(voice_channel_id)):
+                continue
+
+            try:
+                voice_client_dict[voice_channel_id] = await voice_channel.connect()
+            except Exception as e:
+                print(f"Error rejoining {voice_channel.name}: {e}")
+                continue
+
+            music_queue[voice_channel_id] = queue  # In its saved mode
+            self.queue_store.track_channel(voice_channel, text_channel)
+            print(f"Restored {len(queue)} songs in {voice_channel.name}")
+            await text_channel.send(embed=discord.Embed(
+                description=f"I'm back! Resuming the queue in {voice_channel.name} ({len(queue)} songs).",
+                color=0x8A3215
+            ))
+            await self.play_next_in_queue(voice_channel, text_channel)
+
     # ---------------------- Commands ----------------------
 
     @commands.command(name='play', help="Play a song from YouTube/Spotify using a URL or search query.")
@@ -237,6 +426,79 @@ class MusicCog(commands.Cog):
     async def lyrics_music(self, ctx, *, song_title: str = None):
         await self._lyrics_music(ctx, song_title)
 
+    @commands.command(name='move', help="Move a song to another queue position: move <from> <to>")
+    async def move_song(self, ctx, src: int, dst: int):
+        def move(queue):
+            upcoming_count = len(queue) - 1
+            if not (1 <= src <= upcoming_count and 1 <= dst <= upcoming_count):
+                raise ValueError(f"Positions must be between 1 and {upcoming_count}.")
+            song_info = queue[src]
+            queue.move(src, dst)
+            return f"Moved **{song_info.title}** to position {dst}."
+        await self._reshape_queue(ctx, move)
+
+    @commands.command(name='remove', help="Remove songs from the queue: remove <position> [to position]")
+    async def remove_songs(self, ctx, start: int, end: int = None):
+        def remove(queue):
+            removed = queue.remove_range(start, end or start)
+            if not removed:
+                raise ValueError(f"Positions must be between 1 and {len(queue) - 1}.")
+            return f"Removed {removed} song{'s' if removed != 1 else ''}."
+        await self._reshape_queue(ctx, remove)
+
+    @commands.command(name='removeby', help="Remove every upcoming song requested by a member.")
+    async def remove_by_requester(self, ctx, member: discord.Member):
+        def remove(queue):
+            removed = queue.remove_where(lambda song_info: song_info.requester_id == member.id)
+            return f"Removed {removed} song{'s' if removed != 1 else ''} requested by {member.mention}."
+        await self._reshape_queue(ctx, remove)
+
+    @commands.command(name='shuffle', help="Shuffle the upcoming songs.")
+    async def shuffle_queue(self, ctx):
+        def shuffle(queue):
+            queue.shuffle()
+            return f"Shuffled {len(queue) - 1} upcoming songs."
+        await self._reshape_queue(ctx, shuffle)
+
+    @commands.command(name='fairqueue', help="Toggle fair queueing: requesters take turns instead of first come, first served.")
+    async def toggle_fair_queue(self, ctx):
+        voice = ctx.author.voice
+        if not voice or not voice.channel:
+            return await ctx.reply("You must be in a voice channel to use this command.", mention_author=False)
+
+        voice_channel_id = voice.channel.id
+        queue = self._get_or_restore_queue(voice_channel_id)
+        # Queued songs keep their play order (and the weights carry over); only songs added from now on follow the new mode
+        if isinstance(queue, FairMusicQueue):
+            music_queue[voice_channel_id] = MusicQueue(queue, queue.weights)
+            description = "Fair queueing is **off**: songs play in the order they were added."
+        else:
+            music_queue[voice_channel_id] = FairMusicQueue(queue, queue.weights, keep_order=True)
+            description = ("Fair queueing is **on**: requesters take turns, one song each.\n"
+                           "Songs already queued keep their order.")
+
+        embed = discord.Embed(title="**📜 Queue Mode**", description=description, color=0x8A3215)
+        embed.set_footer(icon_url=ctx.author.display_avatar.url, text=f"Changed by: {ctx.author.display_name}")
+        await ctx.reply(embed=embed, mention_author=False)
+
+    @commands.command(name='queueweight', help="Set how many songs a member plays per turn in fair queueing. (Admin only)")
+    @commands.has_permissions(administrator=True)
+    async def set_queue_weight(self, ctx, member: discord.Member, weight: int):
+        voice = ctx.author.voice
+        queue = music_queue.get(voice.channel.id) if voice and voice.channel else None
+        if not isinstance(queue, FairMusicQueue):
+            return await ctx.reply("Fair queueing is not enabled in your voice channel.", mention_author=False)
+
+        queue.set_weight(member.id, weight)
+        await ctx.reply(f"{member.mention} now plays {max(1, weight)} song(s) per turn.", mention_author=False)
+
+    @commands.command(name='dedupe', help="Remove duplicate songs from the queue.")
+    async def dedupe_queue(self, ctx):
+        def dedupe(queue):
+            removed = queue.dedupe(key=lambda song_info: song_info.id or song_info.webpage_url)
+            return f"Removed {removed} duplicate song{'s' if removed != 1 else ''}."
+        await self._reshape_queue(ctx, dedupe)
+
     # ---------------------- Helper Methods ----------------------
     async def _handle_song_request(self, ctx, url_or_query: str) -> dict | None:
         """
@@ -245,10 +507,10 @@ class MusicCog(commands.Cog):
         - Pre-loading embed
         - Checking if it's YT search, direct link, or Spotify link
         - Searching or extracting via yt_dlp
-        - Returning the final song_info dict
+        - Returning the final queue entry (a Track)
 
         Returns:
-        A dict containing song_info
+        A dict containing song_info (Track) and the loading_message
         or None if user canceled/ invalid/ or error occurred.
         """
 
@@ -311,7 +573,7 @@ class MusicCog(commands.Cog):
 
         selected_url = selected_entry['url']
         try:
-            song_info = await self.extract_song_info(selected_url)
+            track_info = await self.extract_song_info(selected_url)
         except ValueError as e:
             await loading_message.edit(embed=discord.Embed(
                 title="Error",
@@ -320,13 +582,10 @@ class MusicCog(commands.Cog):
             ))
             return None
 
-        # If success, attach the 'requested_by' field
-        song_info['requested_by'] = ctx.author
-
-        # Return both the final song_info and the in-progress loading_message
-        # so the caller can finalize the embed
+        # Return both the queue entry (only the requester's id is kept) and the
+        # in-progress loading_message so the caller can finalize the embed
         return {
-            'song_info': song_info,
+            'song_info': Track(track_info, ctx.author.id),
             'loading_message': loading_message
         }
     
@@ -347,9 +606,9 @@ class MusicCog(commands.Cog):
         voice_channel = ctx.author.voice.channel
         voice_channel_id = voice_channel.id
 
-        # 2) Initialize the queue for this channel if not present
-        if voice_channel_id not in music_queue:
-            music_queue[voice_channel_id] = []
+        # 2) Initialize the queue for this channel if not present (restoring the saved one, if any)
+        self._get_or_restore_queue(voice_channel_id)
+        self.queue_store.track_channel(voice_channel, ctx.channel)
 
         # 3) Connect to the channel if the bot is not already connected
         if (voice_channel_id not in voice_client_dict) or (not voice_client_dict[voice_channel_id].is_connected()):
@@ -372,6 +631,12 @@ class MusicCog(commands.Cog):
         if not voice_client:    # something failed or user canceled
             return
 
+        if is_playlist_url(url_or_query):
+            return await self._play_playlist(ctx, voice_client.channel, url_or_query)
+
+        if (spotify_link := parse_spotify_url(url_or_query)) and spotify_link[0] in ('album', 'playlist'):
+            return await self._play_spotify_collection(ctx, voice_client.channel, *spotify_link)
+
         request_result = await self._handle_song_request(ctx, url_or_query)
         if not request_result:  # something failed or user canceled
             return  
@@ -379,18 +644,24 @@ class MusicCog(commands.Cog):
         # Insert the returned track at the END of the queue
         song_info = request_result['song_info']
         loading_message = request_result['loading_message']
-        music_queue[voice_channel_id].append(song_info)
-        print(f"Added to queue in {ctx.author.voice.channel.name}: {song_info['title']}")
+        queue = music_queue[voice_channel_id]
+        queue.append(song_info)
+        position = queue.index(song_info)  # Not the end of the queue in fair mode
+        self.loudness.enqueue(song_info.info)
+        print(f"Added to queue in {ctx.author.voice.channel.name}: {song_info.title}")
 
         # Update loading_message embed
+        description = f"Queue Length: {len(queue)}"
+        if position > 0 and (eta := self.get_eta(voice_channel_id, position)):
+            description += f"\nPlays <t:{eta}:R>"
         embed = discord.Embed(
-            title=song_info['title'],
-            url=song_info['url'],
-            description=f"Queue Length: {len(music_queue[voice_channel_id])}",
+            title=song_info.title,
+            url=song_info.webpage_url,
+            description=description,
             color=0x8A3215,
         )
         embed.set_author(name="Added to Queue 🎶")
-        if thumbnail := song_info['thumbnail']:
+        if thumbnail := song_info.thumbnail:
             embed.set_thumbnail(url=thumbnail)
         await loading_message.edit(embed=embed)
 
@@ -398,6 +669,211 @@ class MusicCog(commands.Cog):
         await self.cancel_timeout_timer(ctx.author.voice.channel)
         if not voice_client_dict[voice_channel_id].is_playing():
             await self.play_next_in_queue(ctx.author.voice.channel, ctx.channel)
+        else:
+            self._ensure_next_song_prefetched(voice_channel_id)
+
+    async def _play_playlist(self, ctx, voice_channel: discord.VoiceChannel, url: str):
+        """Start streaming a playlist into the queue in the background."""
+        voice_channel_id = voice_channel.id
+        loading_embed = discord.Embed(
+            title="Processing your request...",
+            description="Please wait while we list the playlist. 🎵",
+            color=0x8A3215,
+        )
+        loading_message = await ctx.reply(embed=loading_embed, mention_author=False)
+
+        # Only one ingestion per channel at a time
+        if task := ingest_tasks.get(voice_channel_id):
+            task.cancel()
+
+        pages = iter_playlist_pages(url, max_tracks=self.PLAYLIST_MAX_TRACKS)
+        ingest_tasks[voice_channel_id] = self.bot.loop.create_task(
+            self._ingest_songs(ctx, voice_channel, pages, loading_message)
+        )
+
+    async def _play_spotify_collection(self, ctx, voice_channel: discord.VoiceChannel, kind: str, collection_id: str):
+        """Start importing a Spotify album/playlist into the queue in the background."""
+        voice_channel_id = voice_channel.id
+        loading_embed = discord.Embed(
+            title="Processing your request...",
+            description=f"Please wait while we match the Spotify {kind} on YouTube. 🎵",
+            color=0x8A3215,
+        )
+        loading_message = await ctx.reply(embed=loading_embed, mention_author=False)
+
+        if task := ingest_tasks.get(voice_channel_id):
+            task.cancel()
+
+        pages = self._iter_spotify_matches(kind, collection_id)
+        ingest_tasks[voice_channel_id] = self.bot.loop.create_task(
+            self._ingest_songs(ctx, voice_channel, pages, loading_message)
+        )
+
+    async def _iter_spotify_matches(self, kind: str, collection_id: str):
+        """
+        Async generator matching every track of a Spotify album/playlist on YouTube,
+        SPOTIFY_MATCH_CONCURRENCY at a time, yielding each match as soon as it
+        (and every track before it) is done, so the queue keeps the Spotify order.
+
+        Yields:
+            tuple[str, list[TrackInfo]]: (collection name, [track_info]) per matched track
+        """
+        semaphore = asyncio.Semaphore(self.SPOTIFY_MATCH_CONCURRENCY)
+        pending = deque()  # match tasks in Spotify order
+        listed = asyncio.Event()
+        progress = asyncio.Event()
+        name = None
+
+        async def match(track_info):
+            async with semaphore:
+                return await self._match_spotify_track(track_info)
+
+        async def list_tracks():
+            nonlocal name
+            try:
+                async for name, tracks in self.spotify.iter_collection(kind, collection_id, self.PLAYLIST_MAX_TRACKS):
+                    for track_info in tracks:
+                        pending.append(self.bot.loop.create_task(match(track_info)))
+                    progress.set()
+            finally:
+                listed.set()
+                progress.set()
+
+        lister = self.bot.loop.create_task(list_tracks())
+        try:
+            while True:
+                if not pending:
+                    if listed.is_set():
+                        break
+                    progress.clear()
+                    await progress.wait()
+                    continue
+
+                try:
+                    entry = await pending.popleft()
+                except Exception as e:
+                    print(f"Error matching Spotify track: {e}")
+                    continue
+                if entry:
+                    yield name, [search_entry_to_track_info(entry)]
+
+            # Surface listing errors (bad link, API failure) to the caller
+            if lister.done() and not lister.cancelled() and lister.exception():
+                raise lister.exception()
+        finally:
+            lister.cancel()
+            for task in pending:
+                task.cancel()
+
+    async def _ingest_songs(self, ctx, voice_channel: discord.VoiceChannel, pages, loading_message: Message):
+        """
+        Enqueue songs page by page as they arrive, starting playback after the
+        first page instead of waiting for the whole collection.
+
+        Args:
+            voice_channel: the channel the bot joined for the request; the author
+                may have left it by the time this background task runs.
+            pages: async iterator of (collection title, list of TrackInfo) tuples.
+        """
+        voice_channel_id = voice_channel.id
+        total = 0
+        collection_title = None
+        last_edit = 0
+        try:
+            async for title, songs in pages:
+                collection_title = title or collection_title
+                for track_info in songs:
+                    music_queue[voice_channel_id].append(Track(track_info, ctx.author.id))
+                first_page = total == 0
+                total += len(songs)
+
+                # Progress updates at most every few seconds, pages can arrive one song at a time
+                if time.monotonic() - last_edit > 3:
+                    last_edit = time.monotonic()
+                    embed = discord.Embed(
+                        title=collection_title or "Playlist",
+                        description=f"Queued {total} songs so far...\nQueue Length: {len(music_queue[voice_channel_id])}",
+                        color=0x8A3215,
+                    )
+                    embed.set_author(name="Adding Playlist to Queue 🎶")
+                    await loading_message.edit(embed=embed)
+
+                if first_page and songs:
+                    await self.cancel_timeout_timer(voice_channel)
+                    if not voice_client_dict[voice_channel_id].is_playing():
+                        await self.play_next_in_queue(voice_channel, ctx.channel)
+                self._ensure_next_song_prefetched(voice_channel_id)
+
+        except Exception as e:
+            print(f"Error ingesting playlist: {e}")
+        finally:
+            await pages.aclose()
+            if ingest_tasks.get(voice_channel_id) is asyncio.current_task():
+                del ingest_tasks[voice_channel_id]
+
+        embed = discord.Embed(
+            title=collection_title or "Playlist",
+            description=f"Added {total} songs.\nQueue Length: {len(music_queue[voice_channel_id])}",
+            color=0x8A3215 if total else 0xFF0000,
+        )
+        embed.set_author(name="Added Playlist to Queue 🎶" if total else "Couldn't load the playlist")
+        await loading_message.edit(embed=embed)
+
+    def _get_or_restore_queue(self, voice_channel_id: int) -> MusicQueue | FairMusicQueue:
+        """The channel's live queue, else its saved one (in its saved mode), else a new empty one in the default mode."""
+        if (queue := music_queue.get(voice_channel_id)) is None:
+            queue = self.queue_store.restore(voice_channel_id)
+            if queue is None:
+                queue = FairMusicQueue() if self.FAIR_QUEUE_DEFAULT else MusicQueue()
+            music_queue[voice_channel_id] = queue
+        return queue
+
+    async def _reshape_queue(self, ctx, operation):
+        """
+        Run a bulk queue operation on the caller's voice channel queue and reply
+        with a single confirmation, however many songs it touched.
+
+        Args:
+            operation: callable(queue) -> confirmation text, raises ValueError for invalid input.
+        """
+        voice = ctx.author.voice
+        if not voice or not voice.channel:
+            return await ctx.reply("You must be in a voice channel to use this command.", mention_author=False)
+
+        voice_channel_id = voice.channel.id
+        queue = music_queue.get(voice_channel_id)
+        if not queue or len(queue) < 2:
+            return await ctx.reply(f"There are no upcoming songs in {voice.channel.name}.", mention_author=False)
+
+        try:
+            description = operation(queue)
+        except ValueError as e:
+            return await ctx.reply(str(e), mention_author=False)
+
+        embed = discord.Embed(
+            title="**📜 Queue Updated**",
+            description=description,
+            color=0x8A3215,
+        )
+        embed.set_footer(
+            icon_url=ctx.author.display_avatar.url,
+            text=f"Queue Length: {len(queue)} • by {ctx.author.display_name}"
+        )
+        await ctx.reply(embed=embed, mention_author=False)
+
+        # The song after the current one may have changed
+        self._ensure_next_song_prefetched(voice_channel_id)
+
+    def _ensure_next_song_prefetched(self, voice_channel_id: int):
+        """Prefetch the next song now if it was queued after the prefetch timer already fired."""
+        queue = music_queue.get(voice_channel_id)
+        if not queue or queue.next_song is None:
+            return
+        task = prefetch_tasks.get(voice_channel_id)
+        if task is None or task.done():
+            prefetch_tasks[voice_channel_id] = self.bot.loop.create_task(
+                self.prefetch_next_song(voice_channel_id)
+            )
 
     async def _quickplay_music(self, ctx, url_or_query: str):
         voice_client, voice_channel_id = await self._prepare_voice_client_and_queue(ctx)
@@ -411,25 +887,26 @@ class MusicCog(commands.Cog):
         song_info = request_result['song_info']
         loading_message = request_result['loading_message']
 
-        # Insert the track at index 1 for a quickplay
-        music_queue[voice_channel_id].insert(1, song_info)
-        print(f"Quickplaying in {ctx.author.voice.channel.name}: {song_info['title']}")
+        # Insert the track right after the current one for a quickplay
+        music_queue[voice_channel_id].push_next(song_info)
+        self.loudness.enqueue(song_info.info)
+        print(f"Quickplaying in {ctx.author.voice.channel.name}: {song_info.title}")
 
         # Update loading_message embed
         embed = discord.Embed(
-            title=song_info['title'],
-            url=song_info['url'],
+            title=song_info.title,
+            url=song_info.webpage_url,
             description=f"Queue Length: {len(music_queue[voice_channel_id])}",
             color=0x8A3215,
         )
         embed.set_author(name="Quickplaying 🎵")
-        if thumbnail := song_info['thumbnail']:
+        if thumbnail := song_info.thumbnail:
             embed.set_thumbnail(url=thumbnail)
         await loading_message.edit(embed=embed)
 
         # Cancel idle timer and skip the current track if previous song exist
         await self.cancel_timeout_timer(ctx.author.voice.channel)
-        if len(music_queue) == 1:
+        if len(music_queue[voice_channel_id]) == 1:
             await self.play_next_in_queue(ctx.author.voice.channel, ctx.channel)
         else:
             await self._skip_music(ctx)
@@ -446,13 +923,13 @@ class MusicCog(commands.Cog):
         voice_channel_id = voice_channel.id
         try:
             # ----------------- Embed Message ------------------
-            song_info = music_queue[voice_channel_id][0]            
+            song_info = music_queue[voice_channel_id].current
             embed = discord.Embed(
                 title="**⏭️ Skipping Music..**",
-                description=f"[{song_info['title']}]({song_info['url']})",
+                description=f"[{song_info.title}]({song_info.webpage_url})",
                 color=0x8A3215,
             )
-            if thumbnail := song_info['thumbnail']:
+            if thumbnail := song_info.thumbnail:
                 embed.set_thumbnail(url=thumbnail)
             embed.set_footer(
                 icon_url=user.display_avatar.url, 
@@ -465,12 +942,9 @@ class MusicCog(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
             # --------------------------------------------------
             
-            # Stop current playback
-            if voice_channel_id in voice_client_dict and voice_client_dict[voice_channel_id].is_playing():
-                voice_client_dict[voice_channel_id].stop()
-
-            # Do not remove the current song or call play_next_in_queue here
-            # The after_playing callback will handle this
+            # The channel's player drops the current song and starts the next one
+            if player := self._get_player(voice_channel):
+                await player.submit(PlayerCommand.SKIP)
 
         except Exception as e:
             print(f"Error in skip_music for {voice_channel.name}: {e}")
@@ -481,76 +955,116 @@ class MusicCog(commands.Cog):
 
     async def _show_queue(self, ctx: commands.Context | discord.Interaction, interaction=False):
         if isinstance(ctx, discord.Interaction):
-            voice_channel = ctx.user.voice.channel
+            user = ctx.user
             interaction = True
         else:
-            voice_channel = ctx.author.voice.channel
+            user = ctx.author
+        voice_channel = user.voice.channel
         
         # Check if the queue is empty
-        if voice_channel.id not in music_queue or len(music_queue[voice_channel.id]) == 0:
+        queue = music_queue.get(voice_channel.id)
+        if not queue:
             embed = discord.Embed(
                 description=f"The queue is empty in {voice_channel.name}.",
                 color=0x8A3215
             )
-            await ctx.reply(embed=embed, mention_author=False)
+            if interaction:
+                return await ctx.response.send_message(embed=embed, ephemeral=False)
+            return await ctx.reply(embed=embed, mention_author=False)
 
-        # Get the current song
-        current_song = music_queue[voice_channel.id][0]
-        queue_length = len(music_queue[voice_channel.id])
+        embed, page, page_count = self._build_queue_embed(ctx.guild, voice_channel.id, 0)
 
-        # Generate queue list using 'webpage_url' for hyperlinks
-        queue_lines = [
-            f"({idx+1}). **[{song_info['title']}]({song_info['webpage_url']})** • `{self.format_duration(song_info['duration'])}` • <@{song_info['requested_by'].id}>"
-            for idx, song_info in enumerate(music_queue[voice_channel.id][1:])
-        ]
+        # Buttons only when there is more than one page
+        view = None
+        if page_count > 1:
+            view = QueueView(requester_id=user.id, voice_channel_id=voice_channel.id, music_cog=self, page=page)
+            view.update_buttons(page_count)
 
-        # Split queue list into chunks of 1024 characters
-        chunks = []
-        current_chunk = ""
-        for line in queue_lines:
-            if len(current_chunk) + len(line) + 1 > 1024:
-                chunks.append(current_chunk)
-                current_chunk = line
-            else:
-                current_chunk += ("\n" + line) if current_chunk else line
-        if current_chunk:
-            chunks.append(current_chunk)
+        if interaction:
+            return await ctx.response.send_message(embed=embed, view=view, ephemeral=False)
+        await ctx.reply(embed=embed, view=view, mention_author=False)
+
+    def _build_queue_embed(self, guild: discord.Guild, voice_channel_id: int, page: int) -> tuple[discord.Embed, int, int]:
+        """
+        Build the queue embed for one page of upcoming songs.
 
-        # Create the embed
+        Returns:
+            tuple[discord.Embed, int, int]: (embed, page actually shown, page count),
+            the page is clamped since the queue may have shrunk since the last press.
+        """
+        queue = music_queue.get(voice_channel_id)
         embed = discord.Embed(color=0x8A3215)
         embed.set_author(
-            name=f"Music Queue for {ctx.guild.name}",
-            icon_url=ctx.guild.icon.url if ctx.guild.icon else None
+            name=f"Music Queue for {guild.name}",
+            icon_url=guild.icon.url if guild.icon else None
         )
+        if not queue:
+            embed.description = "The queue is empty."
+            return embed, 0, 1
+
+        upcoming_count = len(queue) - 1
+        page_count = max(1, -(-upcoming_count // self.QUEUE_PAGE_SIZE))
+        page = min(max(page, 0), page_count - 1)
+
+        current_song = queue.current
         embed.add_field(
             name="**Now Playing:**",
-            value=f"**[{current_song['title']}]({current_song['webpage_url']})** • `{self.format_duration(current_song['duration'])}` • <@{current_song['requested_by'].id}>",
+            value=f"**[{current_song.title}]({current_song.webpage_url})** • `{self.format_duration(current_song.duration)}` • <@{current_song.requester_id}>",
             inline=False
         )
-
-        # Add queue chunks as fields
-        if queue_length > 1:
-            for i, chunk in enumerate(chunks, start=1):
-                embed.add_field(
-                    name=f"**Queue list (Part {i}):**",
-                    value=chunk,
-                    inline=False
-                )
-        else:
-            embed.add_field(
-                name="**Queue list:**",
-                value="No more songs in the queue.",
-                inline=False
-            )
-
-        # Footer with queue length
-        embed.set_footer(
-            text=f"Queue Length: {queue_length}"
+        embed.add_field(
+            name="**Queue list:**",
+            value=self._get_queue_page(voice_channel_id, queue, page) or "No more songs in the queue.",
+            inline=False
         )
+        footer = f"Page {page + 1}/{page_count} • Queue Length: {len(queue)}"
+        if voice_channel_id in self.playback_started:
+            footer += f" • Remaining: {self.format_duration(queue.total_duration - self.get_elapsed(voice_channel_id))}"
+        embed.set_footer(text=footer)
+        return embed, page, page_count
 
-        if interaction:
-            return await ctx.response.send_message(embed=embed, ephemeral=False)
-        await ctx.reply(embed=embed, mention_author=False)
+    def _get_queue_page(self, voice_channel_id: int, queue: MusicQueue, page: int) -> str:
+        """
+        Render one page of the queue, reusing the rendering until the queue changes.
+        ETAs are absolute Discord timestamps (shown relative by the client), so
+        they only go stale when the queue changes or playback is paused/restarted.
+        """
+        started = self.playback_started.get(voice_channel_id)
+        state = (queue.version, started)
+        cached_state, pages = self.queue_pages.get(voice_channel_id, (None, None))
+        if cached_state != state:
+            pages = {}
+            self.queue_pages[voice_channel_id] = (state, pages)
+
+        if page not in pages:
+            start = page * self.QUEUE_PAGE_SIZE
+            # Only the visible slice is formatted; long titles are clipped to keep the field under 1024 characters
+            lines = []
+            for idx, song_info in enumerate(queue.upcoming(start, start + self.QUEUE_PAGE_SIZE), start=start + 1):
+                line = f"({idx}). **[{self.clip_title(song_info.title)}]({song_info.webpage_url})** • `{self.format_duration(song_info.duration)}` • <@{song_info.requester_id}>"
+                if started is not None:
+                    line += f" • <t:{int(started + queue.wait_time(idx))}:R>"
+                lines.append(line)
+            pages[page] = "\n".join(lines)
+        return pages[page]
+
+    def get_elapsed(self, voice_channel_id: int) -> float:
+        """Seconds played of the current song, not counting pauses."""
+        started = self.playback_started.get(voice_channel_id)
+        if started is None:
+            return 0
+        now = self.paused_at.get(voice_channel_id, time.time())
+        return max(0, now - started)
+
+    def get_eta(self, voice_channel_id: int, index: int) -> int | None:
+        """Unix time at which the song at `index` should start, or None if nothing is playing."""
+        queue = music_queue.get(voice_channel_id)
+        started = self.playback_started.get(voice_channel_id)
+        if not queue or started is None:
+            return None
+        if (paused_at := self.paused_at.get(voice_channel_id)) is not None:
+            started += time.time() - paused_at
+        return int(started + queue.wait_time(index))
             
     async def _pause_music(self, ctx: commands.Context | discord.Interaction, interaction=False):
         
@@ -564,13 +1078,13 @@ class MusicCog(commands.Cog):
         voice_channel = user.voice.channel
         try:
             # ----------------- Embed Message ------------------
-            song_info = music_queue[voice_channel.id][0]            
+            song_info = music_queue[voice_channel.id].current
             embed = discord.Embed(
                 title="**⏸️ Pausing Music..**",
-                description=f"[{song_info['title']}]({song_info['url']})",
+                description=f"[{song_info.title}]({song_info.webpage_url})",
                 color=0x8A3215,
             )
-            if thumbnail := song_info['thumbnail']:
+            if thumbnail := song_info.thumbnail:
                 embed.set_thumbnail(url=thumbnail)
             embed.set_footer(
                 icon_url=user.display_avatar.url, 
@@ -582,7 +1096,9 @@ class MusicCog(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
             # -------------------------------------------------
             
-            voice_client_dict[voice_channel.id].pause()
+            player = self._get_player(voice_channel)
+            if player and await player.submit(PlayerCommand.PAUSE) is PlayerState.PAUSED:
+                self.paused_at.setdefault(voice_channel.id, time.time())
         except Exception as e:
             print(f"Error in pause_music: {e}")
             await ctx.reply("Unable to pause the music.", mention_author=False)
@@ -599,13 +1115,13 @@ class MusicCog(commands.Cog):
         voice_channel_id = user.voice.channel.id
         try:
             # ----------------- Embed Message ------------------
-            song_info = music_queue[voice_channel_id][0]            
+            song_info = music_queue[voice_channel_id].current
             embed = discord.Embed(
                 title="**⏯️ Resuming Music..**",
-                description=f"[{song_info['title']}]({song_info['url']})",
+                description=f"[{song_info.title}]({song_info.webpage_url})",
                 color=0x8A3215,
             )
-            if thumbnail := song_info['thumbnail']:
+            if thumbnail := song_info.thumbnail:
                 embed.set_thumbnail(url=thumbnail)
             embed.set_footer(
                 icon_url=user.display_avatar.url, 
@@ -618,7 +1134,10 @@ class MusicCog(commands.Cog):
                 await ctx.reply(embed=embed, mention_author=False)
             # -------------------------------------------------
             
-            voice_client_dict[voice_channel_id].resume()
+            if player := self._get_player(user.voice.channel):
+                await player.submit(PlayerCommand.RESUME)
+            if (paused_at := self.paused_at.pop(voice_channel_id, None)) is not None and voice_channel_id in self.playback_started:
+                self.playback_started[voice_channel_id] += time.time() - paused_at
         except Exception as e:
             print(f"Error in resume_music: {e}")
             await ctx.reply("Unable to resume the music.", mention_author=False)
@@ -636,9 +1155,8 @@ class MusicCog(commands.Cog):
             
         try:
             # ----------------- Embed Message ------------------  
-            if song_info := music_queue[voice_channel_id]:
-                song_info = song_info[0]
-                description = f"[{song_info['title']}]({song_info['url']})"
+            if song_info := music_queue[voice_channel_id].current:
+                description = f"[{song_info.title}]({song_info.webpage_url})"
             else:
                 description = f"Thankyou for using {self.bot.user.mention}"
 
@@ -647,7 +1165,7 @@ class MusicCog(commands.Cog):
                 description=description,
                 color=0x8A3215,
             )
-            if song_info and (thumbnail := song_info['thumbnail']):
+            if song_info and (thumbnail := song_info.thumbnail):
                 embed.set_thumbnail(url=thumbnail)
             embed.set_footer(
                 icon_url=user.display_avatar.url, 
@@ -661,9 +1179,17 @@ class MusicCog(commands.Cog):
             # --------------------------------------------------
             
             # Stop playback and disconnect, but do not clear the queue
-            if voice_channel_id in voice_client_dict and voice_client_dict[voice_channel_id].is_connected():
-                await voice_client_dict[voice_channel_id].disconnect()
-                del voice_client_dict[voice_channel_id]
+            if task := ingest_tasks.pop(voice_channel_id, None):
+                task.cancel()
+            if player := self._get_player(voice_channel):
+                await player.submit(PlayerCommand.STOP)  # Also drops the warm source, after the prefetch is cancelled
+            else:
+                self.discard_warm_source(voice_channel_id)
+                if voice_channel_id in voice_client_dict and voice_client_dict[voice_channel_id].is_connected():
+                    await voice_client_dict[voice_channel_id].disconnect()
+                    del voice_client_dict[voice_channel_id]
+            self.playback_started.pop(voice_channel_id, None)
+            self.paused_at.pop(voice_channel_id, None)
         except Exception as e:
             print(f"Error in stop_music for {voice_channel.name}: {e}")
             await ctx.reply(f"Unable to stop playback in {voice_channel.name}.", mention_author=False)
@@ -686,8 +1212,13 @@ class MusicCog(commands.Cog):
         voice_channel_id = voice_channel.id
         try:
             if voice_channel_id in music_queue:
-                # Clear the queue
-                music_queue[voice_channel_id].clear()
+                # Stop any playlist still being listed, then clear the queue
+                if task := ingest_tasks.pop(voice_channel_id, None):
+                    task.cancel()
+                if player := self._get_player(voice_channel):
+                    await player.submit(PlayerCommand.PRUNE)
+                else:
+                    music_queue[voice_channel_id].clear()
                 if interaction:
                     await interaction.response.send_message(f"The queue for {voice_channel.name} has been cleared.", ephemeral=True)
                 else:
@@ -704,88 +1235,134 @@ class MusicCog(commands.Cog):
             else:
                 await ctx.reply(f"Unable to clear the queue for {voice_channel.name}.", mention_author=False)
 
+    def _get_player(self, voice_channel, text_channel=None) -> GuildPlayer | None:
+        """
+        The playback actor of a voice channel, created on first use.
+        Without a text_channel no new player is created.
+        """
+        player = players.get(voice_channel.id)
+        if player is None or player.finished:
+            if text_channel is None:
+                return None
+            player = players[voice_channel.id] = GuildPlayer(voice_channel, text_channel, self)
+        elif text_channel is not None:
+            player.text_channel = text_channel  # Announce in the channel used last
+        return player
+
     async def play_next_in_queue(self, voice_channel, text_channel):
-        voice_channel_id = voice_channel.id
+        """Start the current song of the queue, unless something is already playing."""
+        await self._get_player(voice_channel, text_channel).submit(PlayerCommand.PLAY)
 
-        # Check if the queue is empty
-        if voice_channel_id not in music_queue or len(music_queue[voice_channel_id]) == 0:
-            # Start timeout timer for inactivity only if not already set
-            if voice_channel_id not in timeout_timers:
-                await self.start_timeout_timer(voice_channel)
-                print(f"Queue is empty in {voice_channel.name}. Timeout timer started.")
-            return  # Exit if queue is empty
+    async def start_track(self, voice_channel, text_channel, after) -> bool:
+        """
+        Start playing the current song of the queue. Called by the channel's
+        GuildPlayer, which owns all the transitions.
+
+        Returns:
+            bool: False if the song can't be played and should be skipped.
+        """
+        voice_channel_id = voice_channel.id
+        started = time.perf_counter()
+        voice_client = voice_client_dict[voice_channel_id]
 
         # Get the current song
-        current_song = music_queue[voice_channel_id][0]
+        current_song = music_queue[voice_channel_id].current
 
-        try:
-            # Use the direct audio URL
-            source = current_song['url']
+        # Hot tracks are played straight from the disk cache, no stream url needed
+        cached_path = self.audio_cache.lookup(current_song.id) if self.audio_cache else None
 
-            # Play the current song
-            player = discord.FFmpegOpusAudio(source, **ffmpeg_options)
-            voice_client = voice_client_dict[voice_channel_id]
+        # FFmpeg pre-spawned by the prefetch, if it was for this song and is still alive
+        if cached_path:
+            self.discard_warm_source(voice_channel_id)
+            warm = None
+        else:
+            warm = await self._take_warm_source(voice_channel_id, current_song)
 
-            # Get the main event loop
-            loop = asyncio.get_running_loop()
+        # Catch expired/rejected stream urls before FFmpeg is spawned
+        if not cached_path and not warm and not await self.ensure_playable(current_song.info):
+            await self._report_unplayable(voice_channel, text_channel, current_song)
+            return False
 
-            # Define the after callback
-            def after_playing(error):
-                """Triggered when the current song finishes."""
-                if error:
-                    print(f"Error during playback in {voice_channel.name}: {error}")
-                else:
-                    print(f"Finished playing: {current_song['title']}")
+        # Use the measured loudness (static gain) instead of live loudnorm when we have it
+        gain_db = self.loudness.get_gain(current_song.id)
 
-                # Schedule the coroutine on the main event loop
-                asyncio.run_coroutine_threadsafe(
-                    self.handle_next_song(voice_channel, text_channel),
-                    loop
-                )
-            
-            await asyncio.sleep(0.5)    # pre-loading lags
-            voice_client.play(player, after=after_playing)
+        # Play the current song (codec copy for Opus sources in passthrough mode)
+        if cached_path:
+            player = CachedOpusAudio(cached_path)
+            print(f"Playing from audio cache: {current_song.title}")
+        else:
+            if warm:
+                player = warm
+            else:
+                # Cold start: hand over as soon as FFmpeg has produced audio
+                player = WarmOpusSource(discord.FFmpegOpusAudio(current_song.url, **build_ffmpeg_options(current_song.info, gain_db)))
+                if not await asyncio.get_running_loop().run_in_executor(None, player.warm):
+                    player.cleanup()
+                    await self._report_unplayable(voice_channel, text_channel, current_song)
+                    return False
+            if self.audio_cache:
+                self.audio_cache.record_play(current_song.info, gain_db)
+
+        try:
+            voice_client.play(player, after=after)
+        except Exception:
+            player.cleanup()  # Disconnected meanwhile, don't leak FFmpeg and its CDN connection
+            raise
+        handoff = time.perf_counter() - started
+        self.handoff_times.append(handoff)
+        print(f"Handoff in {voice_channel.name}: {handoff * 1000:.0f}ms "
+              f"({'cache' if cached_path else 'warm' if warm else 'cold'})")
+        self.playback_started[voice_channel_id] = time.time()
+        self.paused_at.pop(voice_channel_id, None)
 
+        try:
             # Create and attach the MusicControlView
             music_cog = self  # Since we're inside MusicCog
             view = MusicControlView(voice_channel_id=voice_channel_id, music_cog=music_cog)
 
             # Send an embed message with the current song info and attach the view
             embed = discord.Embed(
-                title=current_song["title"],
-                url=current_song["webpage_url"],
+                title=current_song.title,
+                url=current_song.webpage_url,
                 color=0x8A3215
             )
             embed.set_author(name="🎵 Now Playing")
-            if thumbnail := current_song['thumbnail']:
+            if thumbnail := current_song.thumbnail:
                 embed.set_thumbnail(url=thumbnail)
 
-            embed.description = f"• `{self.format_duration(current_song['duration'])}`\n• <@{current_song['requested_by'].id}>"
+            embed.description = f"• `{self.format_duration(current_song.duration)}`\n• <@{current_song.requester_id}>"
             embed.set_footer(
                 text=f"Queue Length: {len(music_queue[voice_channel_id])}"
             )
             await text_channel.send(embed=embed, view=view)
 
-            print(f"Now playing in {voice_channel.name}: {current_song['title']}")
+            print(f"Now playing in {voice_channel.name}: {current_song.title}")
 
-        except Exception as e:
-            print(f"Error playing next song in {voice_channel.name}: {e}")
+            # Look the lyrics up now so `lyrics` for this song answers immediately
+            self.lyrics.prefetch(current_song.title)
 
-    async def handle_next_song(self, voice_channel, text_channel):
-        """Handle the transition to the next song or start the timeout timer."""
-        voice_channel_id = voice_channel.id
+            # Get the next song ready a few seconds before this one ends
+            await self.start_prefetch_timer(voice_channel, current_song)
+
+        except Exception as e:
+            # The song is playing already, only the announcement failed
+            print(f"Error announcing song in {voice_channel.name}: {e}")
+        return True
 
-        # Remove the current song from the queue if it's still there
-        if voice_channel_id in music_queue and len(music_queue[voice_channel_id]) > 0:
-            music_queue[voice_channel_id].pop(0)
+    async def _report_unplayable(self, voice_channel, text_channel, song_info: Track):
+        print(f"Skipping unplayable song in {voice_channel.name}: {song_info.title}")
+        await text_channel.send(embed=discord.Embed(
+            description=f"Couldn't load **{song_info.title}**, skipping it.",
+            color=0x8A3215
+        ))
 
-        # If the queue has more songs, play the next one
-        if len(music_queue[voice_channel_id]) > 0:
-            await self.play_next_in_queue(voice_channel, text_channel)
-        else:
-            # Start the timeout timer if the queue is empty
-            print(f"Queue is empty in {voice_channel.name}. Starting timeout timer.")
-            await self.start_timeout_timer(voice_channel)
+    async def on_queue_finished(self, voice_channel):
+        """Called by the GuildPlayer once the queue has run out."""
+        print(f"Queue is empty in {voice_channel.name}. Starting timeout timer.")
+        self.discard_warm_source(voice_channel.id)
+        self.playback_started.pop(voice_channel.id, None)
+        self.paused_at.pop(voice_channel.id, None)
+        await self.start_timeout_timer(voice_channel)
 
     async def start_timeout_timer(self, voice_channel):
         voice_channel_id = voice_channel.id
@@ -812,6 +1389,152 @@ class MusicCog(commands.Cog):
             del timeout_timers[voice_channel_id]
             print(f"Timeout canceled for {voice_channel.name} due to activity.")
 
+    async def start_prefetch_timer(self, voice_channel, current_song: Track):
+        voice_channel_id = voice_channel.id
+        await self.cancel_prefetch_timer(voice_channel)
+
+        # Start prefetching PREFETCH_LEAD seconds before the current song ends
+        delay = max(0, current_song.duration - self.PREFETCH_LEAD)
+
+        async def prefetch_task():
+            await asyncio.sleep(delay)
+            await self.prefetch_next_song(voice_channel_id)
+
+        prefetch_tasks[voice_channel_id] = self.bot.loop.create_task(prefetch_task())
+
+    async def cancel_prefetch_timer(self, voice_channel):
+        voice_channel_id = voice_channel.id
+        if voice_channel_id in prefetch_tasks:
+            task = prefetch_tasks.pop(voice_channel_id)
+            # Never cancel ourselves when called from inside the prefetch task
+            if task is not asyncio.current_task():
+                task.cancel()
+
+    async def prefetch_next_song(self, voice_channel_id: int):
+        """
+        Revalidate and warm the stream url of the song queued after the current
+        one and, once the current song is about to end, pre-spawn its FFmpeg.
+        """
+        queue = music_queue.get(voice_channel_id)
+        if not queue or queue.next_song is None:
+            return
+
+        next_track = queue.next_song
+        next_song = next_track.info
+        if self.audio_cache and self.audio_cache.contains(next_song.id):
+            return  # Will be played from the disk cache
+        try:
+            if not self._is_recently_validated(next_song):
+                if not await self.revalidate_song(next_song):
+                    return
+                print(f"Prefetched next song: {next_song.title}")
+
+            # Only close to the handoff, an idle FFmpeg holds a connection to the CDN; never
+            # for livestreams/unknown durations, where the timer fires right at the start
+            remaining = queue.current.duration - self.get_elapsed(voice_channel_id)
+            if queue.current.duration and remaining <= self.PREFETCH_LEAD * 2:
+                await self.warm_next_song(voice_channel_id, next_track)
+        except Exception as e:
+            print(f"Error prefetching {next_song.title}: {e}")
+
+    async def warm_next_song(self, voice_channel_id: int, track: Track):
+        """Spawn FFmpeg for the next song now and read its first packets, so the handoff starts on ready audio."""
+        if (warm := warm_sources.get(voice_channel_id)) and warm[0] is track:
+            return
+        self.discard_warm_source(voice_channel_id)
+
+        gain_db = self.loudness.get_gain(track.id)
+        source = WarmOpusSource(discord.FFmpegOpusAudio(track.url, **build_ffmpeg_options(track.info, gain_db)))
+        warming = asyncio.get_running_loop().run_in_executor(None, source.warm)
+        warm_sources[voice_channel_id] = (track, source, warming)
+        # Shielded: a skip cancels the prefetch task, which must not cancel the warm-up start_track waits on
+        if await asyncio.shield(warming):
+            print(f"Warmed next song in {source.first_packet_after * 1000:.0f}ms: {track.title}")
+
+    async def _take_warm_source(self, voice_channel_id: int, track: Track) -> WarmOpusSource | None:
+        """Take the channel's pre-spawned FFmpeg if it was warmed for this track and produced audio, else kill it."""
+        warm = warm_sources.pop(voice_channel_id, None)
+        if warm is None:
+            return None
+
+        warmed_track, source, warming = warm
+        try:
+            if warmed_track is track and not warming.cancelled() and await asyncio.shield(warming):
+                return source
+        except asyncio.CancelledError:
+            source.cleanup()
+            if not warming.cancelled():
+                raise  # The player itself is being cancelled
+            return None  # Fall back to a cold start
+        except Exception as e:
+            print(f"Error warming {track.title}: {e}")
+        source.cleanup()
+        return None
+
+    def discard_warm_source(self, voice_channel_id: int):
+        """Kill the pre-spawned FFmpeg of a channel, if any."""
+        if warm := warm_sources.pop(voice_channel_id, None):
+            warm[1].cleanup()
+
+    async def revalidate_song(self, track_info: TrackInfo) -> bool:
+        """
+        Re-resolve the song if its stream url is (nearly) expired, then probe it
+        (which also warms the connection and CDN) and re-resolve it once more
+        from webpage_url if the CDN still rejects it.
+
+        Returns:
+            bool: False if the CDN rejects the url even after re-resolving.
+        """
+        if is_stream_expiring(track_info, self.STREAM_EXPIRY_MARGIN):
+            await self.refresh_stream_url(track_info)
+
+        status = await probe_stream(track_info.url)
+        if is_stream_rejected(status) and track_info.webpage_url:
+            await self.refresh_stream_url(track_info, invalidate=True)
+            status = await probe_stream(track_info.url)
+
+        if is_stream_rejected(status):
+            return False
+
+        # A failed probe (status None) is not proof of a dead url, let FFmpeg try
+        track_info.prefetched_at = time.time()
+        return True
+
+    async def ensure_playable(self, track_info: TrackInfo) -> bool:
+        """
+        Just-in-time check before spawning FFmpeg: re-resolve stale entries and
+        preflight the url, unless the prefetch stage validated it moments ago.
+        """
+        if self._is_recently_validated(track_info):
+            return True
+        try:
+            return await self.revalidate_song(track_info)
+        except ValueError as e:
+            print(f"Error re-resolving {track_info.title}: {e}")
+            return False
+
+    def _is_recently_validated(self, track_info: TrackInfo) -> bool:
+        recently_prefetched = time.time() - track_info.prefetched_at < self.PREFETCH_LEAD * 2
+        return recently_prefetched and not is_stream_expiring(track_info, self.STREAM_EXPIRY_MARGIN)
+
+    async def refresh_stream_url(self, track_info: TrackInfo, invalidate: bool = False):
+        """
+        Resolve a fresh stream url for a track, starting from its webpage_url.
+        The TrackInfo is shared, so every queue holding this video gets the new url.
+        """
+        webpage_url = track_info.webpage_url
+        if not webpage_url:
+            raise ValueError("This song cannot be re-resolved.")
+        if invalidate:
+            self.extract_cache.invalidate(get_cache_key(webpage_url))
+
+        refreshed = await self.extract_song_info(webpage_url)
+        if refreshed.url != track_info.url:
+            track_info.set_stream(refreshed.url, refreshed.expires_at, refreshed.acodec)
+        print(f"Re-resolved stream url: {track_info.title}")
+        # Playlist and Spotify tracks are resolved lazily here, so this is where they first have a url to analyze
+        self.loudness.enqueue(track_info)
+
     # TODO: add the query with "lyrics" to avoid music video
     async def search_spotify(self, ctx, url: str):
         track_id = ''
@@ -823,68 +1546,58 @@ class MusicCog(commands.Cog):
         else:
             track_id = url # TODO: might fail (invalid link, give error or smth)
         
-        # 2. Retrieve metadata from Spotify, convert to ytsearch query
-        track_info = self.spotify.track(track_id)
+        # 2. Repeat links are answered from the match cache, no Spotify/YouTube calls
+        if cached_entry := self.spotify_matches.get(track_id=track_id):
+            print(f"Spotify match cache hit: {cached_entry['title']}")
+            return cached_entry
+
+        # 3. Retrieve metadata from Spotify
+        try:
+            track_info = await self.spotify.track(track_id)
+        except Exception as e:
+            print(f"Error fetching Spotify track {track_id}: {e}")
+            return None
+        return await self._match_spotify_track(track_info)
+
+    async def _match_spotify_track(self, track_info: dict) -> dict | None:
+        """Find the YouTube search entry for a Spotify track object."""
+        isrc = track_info.get('external_ids', {}).get('isrc')
+        if cached_entry := self.spotify_matches.get(track_id=track_info['id'], isrc=isrc):
+            return cached_entry
+
         track_name = track_info['name']
         artists = ", ".join(artist['name'] for artist in track_info['artists'])
         query = f"{artists} - {track_name} lyrics"
         
-        # 4. Search youtube normally (TAKES THE FIRST ENTRY! TODO: UPDATE)
+        # Search youtube and score the candidates by duration and title similarity
         youtube_entries = await self.search_youtube(query)
-        if not youtube_entries:
-            return None  # no results on YouTube
-        
-        selected_entry = youtube_entries[0] # takes just the first entries
+        selected_entry = pick_best_match(track_info, youtube_entries)
+        if not selected_entry:
+            print(f"No convincing YouTube match for Spotify track: {artists} - {track_name}")
+            return None
+
+        self.spotify_matches.set(track_info, selected_entry)
         return selected_entry
         
     async def search_youtube(self, query, max_results=5):
+        if (entries := self.search_cache.get(query, max_results)) is not None:
+            return entries
+
+        # Concurrent searches for the same (normalized) query share one API call
+        key = f"search:{SearchCache.make_key(query, max_results)}"
+        entries = await self.inflight.do(key, lambda: self._search_youtube(query, max_results))
+        self.search_cache.set(query, max_results, entries)
+        return [dict(entry) for entry in entries]
+
+    async def _search_youtube(self, query, max_results=5):
         try:
             if not self.YOUTUBE_API_KEY:
                 print("YOUTUBE_API_KEY is not set.")
                 # await ctx.send("Internal error: API key not set.")
                 return []
 
-            youtube = build('youtube', 'v3', developerKey=self.YOUTUBE_API_KEY)
-
-            request = youtube.search().list(
-                q=query,
-                part='id,snippet',
-                maxResults=max_results,
-                type='video',
-                videoEmbeddable='true',  # Filters out non-embeddable videos
-            )
-            response = request.execute()
-            entries = []
-            video_ids = []
-            for item in response['items']:
-                video_id = item['id']['videoId']
-                video_ids.append(video_id)
-                title = item['snippet']['title']
-                thumbnail = item['snippet']['thumbnails']['high']['url']
-                entries.append({
-                    'title': title,
-                    'id': video_id,
-                    'url': f'https://www.youtube.com/watch?v={video_id}',
-                    'duration': None,  # TODO: Will update later
-                    'thumbnail': thumbnail
-                })
-            # Get durations in a batch request
-            video_request = youtube.videos().list(
-                part='contentDetails',
-                id=','.join(video_ids)
-            )
-            video_response = video_request.execute()
-            durations = {}
-            for item in video_response['items']:
-                video_id = item['id']
-                duration_iso = item['contentDetails']['duration']
-                duration_seconds = isodate.parse_duration(duration_iso).total_seconds()
-                durations[video_id] = duration_seconds
-            # Update entries with durations
-            for entry in entries:
-                entry['duration'] = durations.get(entry['id'], 0)
-            return entries
-        except HttpError as e:
+            return await self.youtube_search.search(query, max_results)
+        except (YouTubeSearchError, aiohttp.ClientError) as e:
             print(f"HTTP error occurred: {e}")
             # await ctx.send("Failed to fetch search results from YouTube.")
             return []
@@ -939,10 +1652,24 @@ class MusicCog(commands.Cog):
         
         return selected_entry
 
-    async def extract_song_info(self, url):
-        loop = asyncio.get_event_loop()
+    async def extract_song_info(self, url) -> TrackInfo:
+        # Serve popular tracks from the cache instead of asking yt-dlp again
+        cache_key = get_cache_key(url)
+        if song_info := self.extract_cache.get(cache_key):
+            print(f"Extraction cache hit: {song_info['title']}")
+            return TrackInfo.intern(**song_info)
+
+        # Concurrent requests for the same video share one extraction
+        song_info = await self.inflight.do(
+            f"extract:{cache_key}",
+            lambda: self._extract_song_info(url, cache_key)
+        )
+        # Interned by video id: the metadata is stored once however many queues hold it
+        return TrackInfo.intern(**song_info)
+
+    async def _extract_song_info(self, url, cache_key):
         try:
-            data = await loop.run_in_executor(None, lambda: ytdl.extract_info(url, download=False))
+            data = await extract_pool.extract_info(url)
         except DownloadError as e:
             error_message = str(e)
             if 'Sign in to confirm your age' in error_message:
@@ -960,41 +1687,53 @@ class MusicCog(commands.Cog):
 
         # Extract song information
         song_info = {
+            'id': data.get('id'),
             'url': data['url'],
             'title': data.get('title', 'Unknown Title'),
             'duration': data.get('duration', 0),
             'thumbnail': data.get('thumbnail', None),
             'webpage_url': data.get('webpage_url'),
+            'expires_at': get_stream_expiry(data['url']),
+            'acodec': data.get('acodec'),
         }
+
+        # Store under the canonical key of the resolved page, and under the
+        # requested url's key too when it differs (e.g. non-YouTube links)
+        self.extract_cache.set(get_cache_key(song_info['webpage_url'] or url), song_info)
+        if song_info['webpage_url'] and get_cache_key(song_info['webpage_url']) != cache_key:
+            self.extract_cache.set(cache_key, song_info)
         return song_info
 
     def format_duration(self, seconds: int) -> str:
         """Convert seconds to MM:SS format."""
         minutes, seconds = divmod(int(seconds), 60)
         return f"{minutes}:{seconds:02d}"
+
+    def clip_title(self, title: str, limit: int = 60) -> str:
+        """Shorten a title for list lines, e.g. 'Some Very Long Title…'."""
+        return title if len(title) <= limit else title[:limit - 1].rstrip() + "…"
     
     # TODO: add artist parameter, (search_song support this)
     async def _lyrics_music(self, ctx, song_title = None):
         prefix = self.bot.prefixes_dict.get(str(ctx.guild.id), '>')
+        loading_message = None
         try:
             if not song_title:
                 voice = ctx.author.voice
-                queue = music_queue[voice.channel.id]
-                if (
-                    not voice 
-                    or not voice.channel 
-                    or len(queue) == 0
-                    ):                    
+                queue = music_queue.get(voice.channel.id) if voice and voice.channel else None
+                if not queue:
                     return await ctx.reply("Please provide song title or add music to the queue.", mention_author=False)
-                song_title = queue[0]["title"]
+                song_title = queue.current.title
                 
-            loading_embed = discord.Embed(
-                title="Processing your request...",
-                description="Please wait while we retrieve the song lyrics. 🎙️",
-                color=0x8A3215,
-            )
-            loading_message = await ctx.reply(embed=loading_embed, mention_author=False)
-            song = self.genius.search_song(title=song_title)
+            # Prefetched/cached lyrics are answered right away, without a loading message
+            if not (song := self.lyrics.get_cached(song_title)):
+                loading_embed = discord.Embed(
+                    title="Processing your request...",
+                    description="Please wait while we retrieve the song lyrics. 🎙️",
+                    color=0x8A3215,
+                )
+                loading_message = await ctx.reply(embed=loading_embed, mention_author=False)
+                song = await self.lyrics.get(song_title)
 
             if not song:
                 lyrics_not_found_embed = discord.Embed(
@@ -1005,17 +1744,22 @@ class MusicCog(commands.Cog):
                 return await loading_message.edit(embed=lyrics_not_found_embed)
 
             lyrics_embed = discord.Embed(
-                title=song.title,
-                url=song.url,
+                title=song['title'],
+                url=song['url'],
                 color=0x8A3215
             )
             lyrics_embed.set_author(name="🎙️ Song Lyrics")
-            if thumbnail := song.song_art_image_thumbnail_url:
+            if thumbnail := song['thumbnail']:
                 lyrics_embed.set_thumbnail(url=thumbnail)
-            lyrics_embed.description = song.lyrics
+            lyrics_embed.description = song['lyrics']
             
-            view = LyricsControlView(requester_id=ctx.author.id, lyrics_message=loading_message, lyrics_embed=lyrics_embed)
-            await loading_message.edit(embed=lyrics_embed, view=view)
+            if loading_message:
+                view = LyricsControlView(requester_id=ctx.author.id, lyrics_message=loading_message, lyrics_embed=lyrics_embed, translation_service=self.translation)
+                await loading_message.edit(embed=lyrics_embed, view=view)
+            else:
+                lyrics_message = await ctx.reply(embed=lyrics_embed, mention_author=False)
+                view = LyricsControlView(requester_id=ctx.author.id, lyrics_message=lyrics_message, lyrics_embed=lyrics_embed, translation_service=self.translation)
+                await lyrics_message.edit(view=view)
             
         except Exception as e:
             lyrics_error_embed = discord.Embed(
@@ -1027,5 +1771,8 @@ class MusicCog(commands.Cog):
                 name="Error log:",
                 value=f"```{e}```"
             )
-            await loading_message.edit(embed=lyrics_error_embed)
+            if loading_message:
+                await loading_message.edit(embed=lyrics_error_embed)
+            else:
+                await ctx.reply(embed=lyrics_error_embed, mention_author=False)
         return
\ No newline at end of file
@@ -8,7 +8,10 @@ from discord import Message
 import discord
 import urllib
 # from main import voice_client_dict, ytdl, ffmpeg_options
-from apps.ffmpeg_setup import voice_client_dict, ytdl, ffmpeg_options, music_queue, timeout_timers
+from apps.ffmpeg_setup import voice_client_dict, extract_pool, ffmpeg_options, music_queue, timeout_timers
+from apps.queue_engine import MusicQueue
+from apps.extract_cache import get_stream_expiry
+from apps.track import Track, TrackInfo
 
 async def get_response(user_input: str, message: Message) -> str:
     lowered: str = user_input.lower()
@@ -68,7 +71,7 @@ async def quickplay_music(message: Message):
 
     # Ensure the music queue is initialized for the voice channel
     if voice_channel_id not in music_queue:
-        music_queue[voice_channel_id] = []
+        music_queue[voice_channel_id] = MusicQueue()
 
     try:
         # Connect to the voice channel if not already connected
@@ -77,10 +80,9 @@ async def quickplay_music(message: Message):
             voice_client_dict[voice_channel_id] = voice_client
 
         url = message.content.split()[1]
-        loop = asyncio.get_event_loop()
 
         # Use yt-dlp to extract song metadata
-        data = await loop.run_in_executor(None, lambda: ytdl.extract_info(url, download=False))
+        data = await extract_pool.extract_info(url)
 
         if ("tiktok.com" in url) and (not data.get("url")):
             return "This TikTok video is not compatible for playback."
@@ -95,18 +97,20 @@ async def quickplay_music(message: Message):
         thumbnail = data.get('thumbnail', None)
         webpage_url = data.get('webpage_url')  # The original video URL
 
-        # Prepare the quickplay song dictionary
-        quickplay_song = {
-            'title': song_title,
-            'url': song_url,
-            'webpage_url': webpage_url,
-            'duration': song_duration,
-            'thumbnail': thumbnail,
-            'requested_by': message.author
-        }
+        # Prepare the quickplay queue entry
+        quickplay_song = Track(TrackInfo.intern(
+            id=data.get('id'),
+            title=song_title,
+            webpage_url=webpage_url,
+            duration=song_duration,
+            thumbnail=thumbnail,
+            url=song_url,
+            expires_at=get_stream_expiry(song_url),
+            acodec=data.get('acodec'),
+        ), message.author.id)
 
         # Insert the quickplay song after the current song in the queue
-        music_queue[voice_channel_id].insert(1, quickplay_song)
+        music_queue[voice_channel_id].push_next(quickplay_song)
 
         print(f"Quickplaying in {voice_channel.name}: {song_title}")
 
@@ -143,7 +147,7 @@ async def play_music(message: Message):
 
     # Ensure the music queue is initialized for the voice channel
     if voice_channel_id not in music_queue:
-        music_queue[voice_channel_id] = []
+        music_queue[voice_channel_id] = MusicQueue()
 
     try:
         # Connect to the voice channel if not already connected
@@ -195,8 +199,7 @@ async def play_music(message: Message):
             return    
 
         # Use yt-dlp to extract song metadata
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(None, lambda: ytdl.extract_info(url, download=False))
+        data = await extract_pool.extract_info(url)
 
         if ("tiktok.com" in url) and (not data.get("url")):
             return "This TikTok video is not compatible for playback."
@@ -212,14 +215,16 @@ async def play_music(message: Message):
         webpage_url = data.get('webpage_url')  # The original video URL
 
         # Add to the queue for the voice channel
-        music_queue[voice_channel_id].append({
-            'title': song_title,
-            'url': song_url,
-            'webpage_url': webpage_url,
-            'duration': song_duration,
-            'thumbnail': thumbnail,
-            'requested_by': message.author
-        })
+        music_queue[voice_channel_id].append(Track(TrackInfo.intern(
+            id=data.get('id'),
+            title=song_title,
+            webpage_url=webpage_url,
+            duration=song_duration,
+            thumbnail=thumbnail,
+            url=song_url,
+            expires_at=get_stream_expiry(song_url),
+            acodec=data.get('acodec'),
+        ), message.author.id))
         print(f"Added to queue in {voice_channel.name}: {song_title}")
         
         # Send an embed message with the current song info
@@ -259,13 +264,13 @@ async def play_next_in_queue(voice_channel, text_channel):
         return  # Exit if queue is empty
 
     # Get the current song
-    current_song = music_queue[voice_channel_id][0]
+    current_song = music_queue[voice_channel_id].current
 
     try:
         # Do not stop any existing playback here
 
         # Use the direct audio URL
-        source = current_song['url']
+        source = current_song.url
 
         # Play the current song
         player = discord.FFmpegOpusAudio(source, **ffmpeg_options)
@@ -280,7 +285,7 @@ async def play_next_in_queue(voice_channel, text_channel):
             if error:
                 print(f"Error during playback in {voice_channel.name}: {error}")
             else:
-                print(f"Finished playing: {current_song['title']}")
+                print(f"Finished playing: {current_song.title}")
 
             # Schedule the coroutine on the main event loop
             asyncio.run_coroutine_threadsafe(
@@ -292,21 +297,21 @@ async def play_next_in_queue(voice_channel, text_channel):
 
         # Send an embed message with the current song info
         embed = discord.Embed(
-            title=current_song["title"],
-            url=current_song["webpage_url"],  # Use webpage_url for the embed
+            title=current_song.title,
+            url=current_song.webpage_url,  # Use webpage_url for the embed
             color=0x8A3215
         )
         embed.set_author(name="🎵 Now Playing")
-        if thumbnail := current_song['thumbnail']:
+        if thumbnail := current_song.thumbnail:
             embed.set_thumbnail(url=thumbnail)
                 
-        embed.description = f"•`{format_duration(current_song['duration'])}`\n• <@{current_song['requested_by'].id}>"
+        embed.description = f"•`{format_duration(current_song.duration)}`\n• <@{current_song.requester_id}>"
         embed.set_footer(
-            text=f"Song By: {current_song.get('uploader', 'Unknown')} • Today at {discord.utils.utcnow().strftime('%H:%M')}."
+            text=f"Today at {discord.utils.utcnow().strftime('%H:%M')}."
         )
         await text_channel.send(embed=embed)
 
-        print(f"Now playing in {voice_channel.name}: {current_song['title']}")
+        print(f"Now playing in {voice_channel.name}: {current_song.title}")
 
     except Exception as e:
         print(f"Error playing next song in {voice_channel.name}: {e}")
@@ -317,7 +322,7 @@ async def handle_next_song(voice_channel, text_channel):
 
     # Remove the current song from the queue if it's still there
     if voice_channel_id in music_queue and len(music_queue[voice_channel_id]) > 0:
-        music_queue[voice_channel_id].pop(0)
+        music_queue[voice_channel_id].pop_current()
 
     # If the queue has more songs, play the next one
     if len(music_queue[voice_channel_id]) > 0:
@@ -369,13 +374,13 @@ async def show_queue(message: Message):
         return
 
     # Get the current song
-    current_song = music_queue[voice_channel_id][0]
+    current_song = music_queue[voice_channel_id].current
     queue_length = len(music_queue[voice_channel_id])
 
     # Generate queue list using 'webpage_url' for hyperlinks
     queue_lines = [
-        f"({idx+1}). **[{song['title']}]({song['webpage_url']})** • `{format_duration(song['duration'])}` • <@{song['requested_by'].id}>"
-        for idx, song in enumerate(music_queue[voice_channel_id][1:])
+        f"({idx+1}). **[{song.title}]({song.webpage_url})** • `{format_duration(song.duration)}` • <@{song.requester_id}>"
+        for idx, song in enumerate(music_queue[voice_channel_id].upcoming())
     ]
 
     # Split queue list into chunks of 1024 characters
@@ -398,7 +403,7 @@ async def show_queue(message: Message):
     )
     embed.add_field(
         name="**Now Playing:**",
-        value=f"**[{current_song['title']}]({current_song['webpage_url']})** • `{format_duration(current_song['duration'])}` • <@{current_song['requested_by'].id}>",
+        value=f"**[{current_song.title}]({current_song.webpage_url})** • `{format_duration(current_song.duration)}` • <@{current_song.requester_id}>",
         inline=False
     )
 
@@ -484,10 +489,9 @@ def format_duration(seconds: int) -> str:
 
 
 async def search_youtube(query, max_results=5):
-    loop = asyncio.get_event_loop()
     try:
         search_url = f"ytsearch{max_results}:{query}"
-        data = await loop.run_in_executor(None, lambda: ytdl.extract_info(search_url, download=False))
+        data = await extract_pool.extract_info(search_url)
         return data['entries']
     except Exception as e:
         print(f"Error fetching search results: {e}")
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+import threading
+
+class JsonStore:
+    """
+    A small persistent dict backed by a JSON file.
+
+    Writes are debounced: set() marks the store dirty and the file is rewritten
+    (atomically, through a temp file) a few seconds later, off the event loop.
+    Only a shallow copy of the dict is taken on the loop, the JSON encoding runs
+    in the executor, so stored values must be replaced with set(), never mutated.
+    """
+
+    def __init__(self, path: str, flush_delay: float = 5):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._data = self._load()
+        self._flush_handle = None
+        self._write_lock = threading.Lock()  # Background writes share the temp file
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get(self, key: str, default=None):
+        return self._data.get(key, default)
+
+    def set(self, key: str, value):
+        self._data[key] = value
+        self._schedule_flush()
+
+    def pop(self, key: str, default=None):
+        value = self._data.pop(key, default)
+        self._schedule_flush()
+        return value
+
+    def items(self):
+        return self._data.items()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def _schedule_flush(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()  # No loop (e.g. scripts), write right away
+            return
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_delay, self._flush_in_background, loop)
+
+    def _flush_in_background(self, loop):
+        self._flush_handle = None
+        # Copying the dict is cheap; encoding thousands of values would stall the loop
+        snapshot = dict(self._data)
+        loop.run_in_executor(None, self._dump, snapshot)
+
+    def flush(self):
+        """Write the store to disk right away."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._dump(dict(self._data))
+
+    def _dump(self, snapshot: dict):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            payload = json.dumps(snapshot, ensure_ascii=False)
+            with self._write_lock:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving {self.path}: {e}")
@@ -0,0 +1,10 @@
+import re
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so near-identical queries share one key:
+    case-folded, punctuation stripped and whitespace collapsed.
+    e.g. "  Never Gonna  Give You Up!! " -> "never gonna give you up"
+    """
+    query = re.sub(r'[^\w\s]', ' ', query.casefold())
+    return ' '.join(query.split())